@@ -0,0 +1,274 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+CACHE_VERSION = 1  # Bump whenever the layout of cached files changes
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.asset_cache')
+CACHE_DIR = os.path.join(CACHE_ROOT, f'v{CACHE_VERSION}')
+
+# What the build step (python assets.py) preprocesses
+IMAGE_SOURCES = ['assets/skybox/*.bmp', 'assets/1024x512/*/*.png', 'assets/plane/*.png']
+SOUND_SOURCES = ['sounds/*.wav']
+
+LOADER_THREADS = 2
+UPLOAD_BUDGET = 0.004  # Seconds of main-thread GL uploads per frame
+
+TEXTURE_MAGIC = 0x41424752  # b'RGBA'
+HEADER_WORDS = 4  # magic, width, height, mipmap levels
+
+_hashes = {}  # (path, size, mtime) -> source digest, for this process
+_textures = {}  # path -> Texture
+
+class Texture:
+    """RGBA pixels of one image and its precomputed mipmaps, top row first. Backed by the
+    memory-mapped cache file, so the levels are views handed straight to glTexImage2D."""
+
+    def __init__(self, data):
+        self.data = data
+        magic, width, height, count = data[:HEADER_WORDS * 4].view(np.uint32)
+        if magic != TEXTURE_MAGIC:
+            raise ValueError("Not a cached texture")
+        self.width, self.height = int(width), int(height)
+        self.levels = []  # (width, height, pixels) from full size down to 1x1
+        offset = HEADER_WORDS * 4
+        for _ in range(count):
+            size = width * height * 4
+            self.levels.append((int(width), int(height), data[offset:offset + size]))
+            offset += size
+            width, height = max(1, width // 2), max(1, height // 2)
+
+    def upload(self, target=GL_TEXTURE_2D):
+        # Every level into the bound texture; pair with a *_MIPMAP_* min filter
+        for level, (width, height, pixels) in enumerate(self.levels):
+            glTexImage2D(target, level, GL_RGBA8, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+
+def source_hash(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = _hashes[key] = h.hexdigest()
+    return digest
+
+def mipmaps(pixels):
+    # Box-filtered chain down to 1x1; an odd last row or column is dropped when halving
+    levels = [pixels]
+    while pixels.shape[0] > 1 or pixels.shape[1] > 1:
+        height, width = max(1, pixels.shape[0] // 2), max(1, pixels.shape[1] // 2)
+        rows = 2 if pixels.shape[0] > 1 else 1
+        columns = 2 if pixels.shape[1] > 1 else 1
+        blocks = pixels[:height * rows, :width * columns].reshape(height, rows, width, columns, 4)
+        pixels = ((blocks.sum(axis=(1, 3), dtype=np.uint32) + rows * columns // 2) // (rows * columns)).astype(np.uint8)
+        levels.append(pixels)
+    return levels
+
+def encode_texture(path):
+    surface = pygame.image.load(path)
+    width, height = surface.get_size()
+    pixels = np.frombuffer(pygame.image.tostring(surface, 'RGBA'), dtype=np.uint8).reshape(height, width, 4)
+    levels = mipmaps(pixels)
+    header = np.array([TEXTURE_MAGIC, width, height, len(levels)], dtype=np.uint32)
+    return np.concatenate([header.view(np.uint8)] + [level.ravel() for level in levels])
+
+def encode_sound(path):
+    # PCM in the mixer's current format, exactly what Sound(buffer=...) expects
+    return np.frombuffer(pygame.mixer.Sound(path).get_raw(), dtype=np.uint8)
+
+def sound_format():
+    frequency, size, channels = pygame.mixer.get_init()
+    return f'{frequency}_{size}_{channels}'
+
+def texture_cache_path(path):
+    return os.path.join(CACHE_DIR, source_hash(path) + '.rgba')
+
+def sound_cache_path(path):
+    return os.path.join(CACHE_DIR, f'{source_hash(path)}.{sound_format()}.pcm')
+
+def cached(path, cache_path, encode):
+    # Memory-map the cache file, building it first if needed. Writes go through a temporary
+    # file so a half-written entry is never picked up.
+    if not os.path.exists(cache_path):
+        data = encode(path)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            temporary = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            data.tofile(temporary)
+            os.replace(temporary, cache_path)
+        except OSError:
+            return data  # Read-only install: use the freshly decoded copy
+    return np.memmap(cache_path, dtype=np.uint8, mode='r')
+
+def load_texture(path):
+    texture = _textures.get(path)
+    if texture is None:
+        texture = _textures[path] = Texture(cached(path, texture_cache_path(path), encode_texture))
+    return texture
+
+def load_sound(path):
+    # Needs an initialised mixer; raises pygame.error / FileNotFoundError like mixer.Sound(path)
+    return pygame.mixer.Sound(buffer=cached(path, sound_cache_path(path), encode_sound))
+
+def clear_cache():
+    _textures.clear()
+
+def create_texture(texture, target=GL_TEXTURE_2D):
+    # New GL texture with every mip level of texture, trilinear filtered
+    texture_id = glGenTextures(1)
+    glBindTexture(target, texture_id)
+    texture.upload(target)
+    glTexParameteri(target, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(target, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glBindTexture(target, 0)
+    return texture_id
+
+class AssetHandle:
+    """Future for one asset. ready turns true on the main thread once the background decode
+    and the (optional) main-thread upload are done; value is then the loaded asset. An upload
+    may be a generator, yielding between pieces of GL work and returning the asset."""
+
+    def __init__(self, name, future, upload, critical):
+        self.name = name
+        self.future = future
+        self.upload = upload
+        self.critical = critical
+        self.steps = None  # Upload generator under way
+        self.value = None
+        self.error = None
+        self.ready = False
+        self.callbacks = []
+
+    @property
+    def done(self):
+        return self.ready or self.error is not None
+
+    def get(self, default=None):
+        return self.value if self.ready else default
+
+    def then(self, callback):
+        # callback(value) on the main thread once ready; right away if it already is
+        if self.ready:
+            callback(self.value)
+        else:
+            self.callbacks.append(callback)
+
+    def step(self):
+        # One piece of main-thread work once decoded; True when the handle is done
+        try:
+            if self.steps is None:
+                value = self.future.result()
+                if self.upload is not None:
+                    value = self.upload(value)
+                if not isinstance(value, types.GeneratorType):
+                    self.finish(value)
+                    return True
+                self.steps = value
+            next(self.steps)
+            return False
+        except StopIteration as e:
+            self.finish(e.value)
+        except Exception as e:
+            self.error = e
+            print(f"Warning: Could not load asset '{self.name}'. Error: {e}")
+        return True
+
+    def finish(self, value):
+        self.value = value
+        self.ready = True
+        for callback in self.callbacks:
+            callback(value)
+        self.callbacks = []
+
+class AssetManager:
+    """Decodes assets on a background thread pool so the game keeps drawing frames meanwhile.
+    Anything touching GL runs in update(), on the main thread, for at most upload_budget
+    seconds per frame (but at least one upload step, so loading always moves on)."""
+
+    def __init__(self, threads=LOADER_THREADS, upload_budget=UPLOAD_BUDGET):
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='assets')
+        self.upload_budget = upload_budget
+        self.handles = []  # In submission order
+        self.pending = []  # Not done yet
+
+    def load(self, name, decode, upload=None, critical=False):
+        # decode() runs on a worker thread and must not touch GL; upload(decoded) runs in update()
+        handle = AssetHandle(name, self.pool.submit(decode), upload, critical)
+        self.handles.append(handle)
+        self.pending.append(handle)
+        return handle
+
+    def texture(self, path, critical=False):
+        return self.load(path, lambda: load_texture(path), create_texture, critical)
+
+    def update(self):
+        deadline = time.perf_counter() + self.upload_budget
+        worked = False
+        for handle in list(self.pending):
+            if not handle.future.done():
+                continue
+            while True:
+                if worked and time.perf_counter() > deadline:
+                    return
+                worked = True
+                if handle.step():
+                    self.pending.remove(handle)
+                    break
+
+    def ready(self, critical_only=True):
+        return all(h.done for h in self.pending if h.critical or not critical_only)
+
+    def progress(self):
+        # Fraction of assets done (loaded or failed)
+        if not self.handles:
+            return 1.0
+        return 1.0 - len(self.pending) / len(self.handles)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def sources(patterns):
+    return [path for pattern in patterns for path in sorted(glob.glob(pattern))]
+
+def prune(keep):
+    # Remove other cache versions and entries whose source changed or went away
+    for name in os.listdir(CACHE_ROOT):
+        path = os.path.join(CACHE_ROOT, name)
+        if path != CACHE_DIR:
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if path not in keep:
+            os.remove(path)
+
+def build():
+    import sound
+    keep = set()
+    for path in sources(IMAGE_SOURCES):
+        keep.add(texture_cache_path(path))
+        load_texture(path)
+        print(f"texture {path}")
+    try:
+        sound.init_mixer()
+    except pygame.error as e:
+        print(f"Warning: No audio device, sounds not cached. Error: {e}")
+    else:
+        for path in sources(SOUND_SOURCES):
+            keep.add(sound_cache_path(path))
+            load_sound(path)
+            print(f"sound {path}")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    prune(keep)
+
+if __name__ == '__main__':
+    build()
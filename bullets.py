@@ -0,0 +1,160 @@
+import numpy as np
+import threading
+
+BULLET_SPEED = 2.5  # Units per frame
+BULLET_LIFE = 60  # Frames
+HIT_RADIUS = 2.0  # Hitbox size around a plane's centre
+INITIAL_CAPACITY = 64
+REMOTE_BULLET_CAPACITY = 512  # Oldest remote bullet is overwritten past this
+
+def forward_vectors(yaw, pitch):
+    # Same forward vector the planes use; works on scalars or arrays of degrees
+    yaw_rad = np.radians(yaw)
+    pitch_rad = np.radians(pitch)
+    cos_pitch = np.cos(pitch_rad)
+    return np.stack([np.sin(yaw_rad) * cos_pitch, np.sin(pitch_rad), -np.cos(yaw_rad) * cos_pitch], axis=-1)
+
+def segment_sphere_hits(start, end, centers, radius):
+    # Fraction t in [0, 1] along each segment where it first enters each sphere, inf for a miss.
+    # start/end are (B, 3), centers (P, 3); returns (B, P). Catches bullets that would step
+    # right through a target between frames.
+    d = end - start
+    m = start[:, None, :] - centers[None, :, :]
+    a = np.einsum('bk,bk->b', d, d)[:, None]
+    b = np.einsum('bpk,bk->bp', m, d)
+    c = np.einsum('bpk,bpk->bp', m, m) - radius * radius
+    disc = b * b - a * c
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+    t = np.where((disc >= 0) & (b < 0) & (t <= 1.0), t, np.inf)
+    return np.where(c <= 0, 0.0, t)  # Already inside at the start of the step
+
+class BulletPool:
+    """Bullets stored as parallel NumPy arrays; slots [0, count) are live."""
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.count = 0
+        self.pos = np.zeros((capacity, 3))
+        self.dir = np.zeros((capacity, 3))  # Unit vectors, computed once at fire time
+        self.speed = np.zeros(capacity)
+        self.life = np.zeros(capacity)  # Frames left; fractional when stepped with k != 1
+        self.owner = np.zeros(capacity, dtype=np.int32)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.fired = []  # Bullets spawned since the last drain_fired(), for the network
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.fired = []
+
+    def grow(self):
+        capacity = len(self.pos) * 2
+        for name in ('pos', 'dir', 'speed', 'life', 'owner', 'damage'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, z, yaw, pitch, owner, damage, speed=BULLET_SPEED, life=BULLET_LIFE):
+        if self.count == len(self.pos):
+            self.grow()
+        i = self.count
+        self.pos[i] = (x, y, z)
+        self.dir[i] = forward_vectors(yaw, pitch)
+        self.speed[i] = speed
+        self.life[i] = life
+        self.owner[i] = owner
+        self.damage[i] = damage
+        self.count += 1
+        self.fired.append({'x': x, 'y': y, 'z': z, 'yaw': yaw, 'pitch': pitch})
+
+    def drain_fired(self):
+        fired = self.fired
+        self.fired = []
+        return fired
+
+    def step(self, planes=None, k=1.0):
+        # Move every bullet k frames, then sweep each bullet's path against all planes at once.
+        # Returns (plane, damage) per hit, in bullet order; the plane the bullet reaches first wins.
+        n = self.count
+        if n == 0:
+            return []
+        pos = self.pos[:n]
+        start = pos.copy()
+        pos += self.dir[:n] * (self.speed[:n, None] * k)
+        self.life[:n] -= k
+
+        hits = []
+        if planes:
+            targets = np.array([(p.x, p.y, p.z) for p in planes])
+            alive = np.array([p.health > 0 for p in planes])
+            ids = np.array([p.player_id for p in planes])
+            t = segment_sphere_hits(start, pos, targets, HIT_RADIUS)
+            t[:, ~alive] = np.inf
+            t[ids[None, :] == self.owner[:n, None]] = np.inf
+            first = t.argmin(axis=1)
+            hit_rows = np.flatnonzero(np.isfinite(t[np.arange(n), first]))
+            for row in hit_rows:
+                hits.append((planes[first[row]], int(self.damage[row])))
+            self.life[hit_rows] = 0  # Bullet disappears on hit
+
+        self.compact()
+        return hits
+
+    def compact(self):
+        n = self.count
+        keep = np.flatnonzero(self.life[:n] > 0)
+        if len(keep) == n:
+            return
+        for arr in (self.pos, self.dir, self.speed, self.life, self.owner, self.damage):
+            arr[:len(keep)] = arr[keep]
+        self.count = len(keep)
+
+    def live(self):
+        # Positions and directions of live bullets, for drawing
+        return self.pos[:self.count], self.dir[:self.count]
+
+class RemoteBulletPool:
+    """Fixed-size ring of bullets fired by other players. Filled by the network thread,
+    advanced and drawn by the main loop; a slot is free once its life runs out."""
+
+    def __init__(self, capacity=REMOTE_BULLET_CAPACITY):
+        self.pos = np.zeros((capacity, 3))
+        self.dir = np.zeros((capacity, 3))
+        self.speed = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.owner = np.zeros(capacity, dtype=np.int32)
+        self.next = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def clear(self):
+        with self.lock:
+            self.life[:] = 0
+
+    def spawn(self, x, y, z, yaw, pitch, owner, speed=BULLET_SPEED, life=BULLET_LIFE):
+        with self.lock:
+            i = self.next
+            self.pos[i] = (x, y, z)
+            self.dir[i] = forward_vectors(yaw, pitch)
+            self.speed[i] = speed
+            self.life[i] = life
+            self.owner[i] = owner
+            self.next = (i + 1) % len(self.life)
+
+    def step(self, k=1.0):
+        # Same ballistics as local bullets; hits are reported by the shooter, so no hit test here
+        with self.lock:
+            live = self.life > 0
+            self.pos[live] += self.dir[live] * (self.speed[live, None] * k)
+            self.life[live] -= k
+
+    def live(self):
+        # Copies, since the network thread may spawn into the arrays while we draw
+        with self.lock:
+            live = np.flatnonzero(self.life > 0)
+            return self.pos[live], self.dir[live]
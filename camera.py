@@ -1,6 +1,8 @@
 import math
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from frustum import Frustum
+from lod import View
 
 class Camera:
     def __init__(self, plane):
@@ -16,26 +18,34 @@ class Camera:
 
     def apply(self):
         mode = self.get_mode()
-        player = self.plane
+        player = self.plane  # Drawn at the interpolated render pose, not the last physics tick
 
         if mode == 'chase':
             offset_z = 12
             offset_y = 4
-            camera_x = player.x - offset_z * math.sin(math.radians(player.yaw))
-            camera_y = player.y + offset_y
-            camera_z = player.z - offset_z * math.cos(math.radians(player.yaw))
-            gluLookAt(camera_x, camera_y, camera_z, player.x, player.y, player.z, 0, 1, 0)
+            camera_x = player.render_x - offset_z * math.sin(math.radians(player.render_yaw))
+            camera_y = player.render_y + offset_y
+            camera_z = player.render_z - offset_z * math.cos(math.radians(player.render_yaw))
+            gluLookAt(camera_x, camera_y, camera_z, player.render_x, player.render_y, player.render_z, 0, 1, 0)
         elif mode == 'cockpit':
-            glRotatef(-player.pitch, 1, 0, 0)
-            glRotatef(-player.roll, 0, 0, 1)
-            glRotatef(-player.yaw, 0, 1, 0)
-            glTranslatef(-player.x, -player.y - 0.5, -player.z)
+            glRotatef(-player.render_pitch, 1, 0, 0)
+            glRotatef(-player.render_roll, 0, 0, 1)
+            glRotatef(-player.render_yaw, 0, 1, 0)
+            glTranslatef(-player.render_x, -player.render_y - 0.5, -player.render_z)
         elif mode == 'tail':
             glTranslatef(0, -2, -8)
-            glRotatef(-player.pitch, 1, 0, 0)
-            glRotatef(-player.roll, 0, 0, 1)
-            glRotatef(-player.yaw, 0, 1, 0)
-            glTranslatef(-player.x, -player.y, -player.z)
+            glRotatef(-player.render_pitch, 1, 0, 0)
+            glRotatef(-player.render_roll, 0, 0, 1)
+            glRotatef(-player.render_yaw, 0, 1, 0)
+            glTranslatef(-player.render_x, -player.render_y, -player.render_z)
+
+    def frustum(self):
+        # Call after the projection is set and apply() has run
+        return Frustum.from_gl()
+
+    def view(self):
+        # Eye position and pixel scale for LOD selection; same timing as frustum()
+        return View.from_gl()
 
     def update(self):
         # This method is not strictly needed with the current "apply" logic
@@ -1,76 +1,77 @@
 from OpenGL.GL import *
 import random
 from utils import draw_cube
+import meshes
+from scenery import SceneryRenderer, build_chunk_arrays
+from world import World, ObstacleIndex, DEFAULT_WORLD_SEED
+from frustum import CullStats, mountain_sphere, tree_sphere, cloud_sphere
+from lod import LodSelector, TREE_LOD_PIXELS, CLOUD_LOD_PIXELS, TREE_RADIUS, CLOUD_RADIUS
+from scenery import CLOUD_SPHERE_STEPS
+from utils import draw_billboard
 import math
 
 class Environment:
-    def __init__(self):
+    def __init__(self, world_seed=DEFAULT_WORLD_SEED):
+        # Flattened scenery of the active chunks, rebuilt whenever that set changes
         self.mountains = []
         self.trees = []
         self.runways = []
         self.clouds = []  # New: clouds for weather effects
         self.generation_radius = 200
-        self.culling_radius = 250
-        self.last_player_pos = [0, 0, 0]
+        self.world = World(world_seed, prepare=build_chunk_arrays)
+        self.active_chunks = []
+        self.obstacles = ObstacleIndex()  # Spatial grids over the active chunks
         self.weather = "clear"  # clear, cloudy, storm
         self.time_of_day = "day"  # day, night, sunset
         self.rain_particles = []  # For rain effects
+        self.scenery_renderer = None  # Created lazily once a GL context exists
+        # Per-object LOD for the immediate path; the VBO path picks LODs per chunk
+        self.tree_lod = LodSelector(TREE_LOD_PIXELS)
+        self.cloud_lod = LodSelector(CLOUD_LOD_PIXELS)
 
     def update(self, player_pos):
-        if math.dist(player_pos, self.last_player_pos) > 100:
-            self.last_player_pos = list(player_pos)
-            self.generate_scenery(player_pos)
-            self.cull_scenery(player_pos)
-
-    def generate_scenery(self, center_pos, mountain_count=5, tree_count=20, runway_chance=0.1):
-        # Generate mountains
-        for _ in range(mountain_count):
-            x = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[0]
-            z = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[2]
-            y = 0
-            if any(math.dist([x,y,z], m['pos']) < 30 for m in self.mountains): continue # Avoid clumping
-            height = random.uniform(5, 30)
-            base = random.uniform(5, 20)
-            self.mountains.append({'pos': [x, y, z], 'height': height, 'base': base})
-        
-        # Generate trees
-        for _ in range(tree_count):
-            x = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[0]
-            z = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[2]
-            
-            on_runway = False
-            for r_pos, r_size, _ in self.runways:
-                if (r_pos[0] - r_size[0]/2 < x < r_pos[0] + r_size[0]/2) and \
-                   (r_pos[2] - r_size[1]/2 < z < r_pos[2] + r_size[1]/2):
-                    on_runway = True
-                    break
-            if on_runway: continue
-
-            y = 0
-            if any(math.dist([x,y,z], t) < 3 for t in self.trees): continue
-            self.trees.append([x, y, z])
-
-        # Generate runways
-        if random.random() < runway_chance:
-            x = center_pos[0]
-            z = center_pos[2]
-            y = 0.1
-            angle = random.choice([0, 90, 180, 270])
-            self.runways.append(([x, y, z], [10, 200], angle))
-            
-        # Generate clouds
+        # Chunks are generated on worker threads; this only picks up the finished ones
+        if self.world.update(player_pos):
+            self.refresh_scenery(player_pos)
+
+    def load_around(self, player_pos):
+        # Generate every chunk around player_pos right away (start of a game)
+        self.world.update(player_pos, wait=True)
+        self.refresh_scenery(player_pos)
+
+    def set_world_seed(self, seed, player_pos):
+        if seed == self.world.seed:
+            return
+        self.world.close()
+        self.world = World(seed, prepare=build_chunk_arrays)
+        self.load_around(player_pos)
+
+    def refresh_scenery(self, center_pos):
+        chunks = self.active_chunks = self.world.active_chunks(center_pos)
+        self.obstacles.rebuild(chunks)
+        self.mountains = self.obstacles.mountains
+        self.trees = self.obstacles.trees
+        self.runways = self.obstacles.runways
         if self.weather in ["cloudy", "storm"]:
-            for _ in range(10):
-                x = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[0]
-                z = random.uniform(-self.generation_radius, self.generation_radius) + center_pos[2]
-                y = random.uniform(20, 50)  # High altitude
-                size = random.uniform(5, 15)
-                self.clouds.append({'pos': [x, y, z], 'size': size})
-
-    def cull_scenery(self, center_pos):
-        self.mountains = [m for m in self.mountains if math.dist(m['pos'], center_pos) < self.culling_radius]
-        self.trees = [t for t in self.trees if math.dist(t, center_pos) < self.culling_radius]
-        self.runways = [r for r in self.runways if math.dist(r[0], center_pos) < self.culling_radius]
+            self.clouds = [cl for c in chunks for cl in c.clouds]
+        else:
+            self.clouds = []
+        self.tree_lod.retain((t[0], t[2]) for t in self.trees)
+        self.cloud_lod.retain((c['pos'][0], c['pos'][2]) for c in self.clouds)
+
+    def obstacles_near(self, x, z, radius):
+        return self.obstacles.near(x, z, radius)
+
+    def on_runway(self, x, z):
+        return self.obstacles.on_runway(x, z)
+
+    def height_at(self, x, z):
+        # Terrain-collision query for planes (PlaneModel.terrain)
+        return self.obstacles.height_at(x, z)
+
+    def heights_at(self, xs, zs):
+        # Same for arrays of points (PlaneBatch.terrain)
+        return self.obstacles.heights_at(xs, zs)
 
     def draw_ground(self, center_pos):
         size = self.generation_radius * 2
@@ -147,19 +148,24 @@ class Environment:
         glVertex3f(x - base, y, z - base)
         glEnd()
 
-    def draw_tree(self, position):
+    def draw_tree(self, position, lod=0, view=None):
         x, y, z = position
+        if lod == 2 and view is not None:
+            glColor3f(0.1, 0.5, 0.1)
+            draw_billboard(view, x, y + 2.25, z, 0.75, 2.25)
+            return
         
         glPushMatrix()
         glTranslatef(x, y, z)
 
-        # Trunk
-        glColor3f(0.5, 0.35, 0.25) # Brown
-        glPushMatrix()
-        glTranslatef(0, 1.5, 0)
-        glScalef(0.2, 3.0, 0.2)
-        draw_cube()
-        glPopMatrix()
+        # Trunk (too thin to see once the tree is small)
+        if lod == 0:
+            glColor3f(0.5, 0.35, 0.25) # Brown
+            glPushMatrix()
+            glTranslatef(0, 1.5, 0)
+            glScalef(0.2, 3.0, 0.2)
+            draw_cube()
+            glPopMatrix()
 
         # Canopy
         glColor3f(0.1, 0.5, 0.1) # Dark green
@@ -171,7 +177,10 @@ class Environment:
 
         glPopMatrix()
 
-    def draw(self, player_pos):
+    def draw(self, player_pos, frustum=None, stats=None, view=None):
+        # With a frustum, chunks (VBO path) or single objects (immediate path) outside it are skipped;
+        # stats counts what was kept and rejected. With a view, trees and clouds get a level of detail.
+
         # Set lighting based on time of day
         if self.time_of_day == "night":
             glLightfv(GL_LIGHT0, GL_AMBIENT, [0.1, 0.1, 0.2, 1.0])  # Blue ambient light
@@ -183,25 +192,57 @@ class Environment:
             glLightfv(GL_LIGHT0, GL_AMBIENT, [0.3, 0.3, 0.3, 1.0])  # Normal ambient
             glLightfv(GL_LIGHT0, GL_DIFFUSE, [1.0, 1.0, 1.0, 1.0])  # Normal light
             
+        if stats is None:
+            stats = CullStats()
+
+        def visible(sphere):
+            return frustum is None or stats.count(frustum.sphere_visible(*sphere))
+
         self.draw_ground(player_pos)
         for r_pos, r_size, r_angle in self.runways:
-            self.draw_runway(r_pos, r_size, r_angle)
-        for mountain in self.mountains:
-            self.draw_mountain(mountain['pos'], mountain['height'], mountain['base'])
-        for tree in self.trees:
-            glPushMatrix()
-            self.draw_tree(tree)
-            glPopMatrix()
-        for cloud in self.clouds:
-            self.draw_cloud(cloud['pos'], cloud['size'])
+            if visible((r_pos[0], 0, r_pos[2], r_size[1] / 2)):
+                self.draw_runway(r_pos, r_size, r_angle)
+        def level(selector, key, sphere):
+            if view is None:
+                return 0
+            return selector.select(key, view.screen_size(sphere[3], view.distance(*sphere[:3])))
+
+        if meshes.USE_VBO:
+            self.draw_batched(frustum, stats, view)
+        else:
+            for mountain in self.mountains:
+                if visible(mountain_sphere(mountain)):
+                    self.draw_mountain(mountain['pos'], mountain['height'], mountain['base'])
+            for tree in self.trees:
+                sphere = tree_sphere(tree)
+                if visible(sphere):
+                    glPushMatrix()
+                    self.draw_tree(tree, level(self.tree_lod, (tree[0], tree[2]), sphere), view)
+                    glPopMatrix()
+            for cloud in self.clouds:
+                sphere = cloud_sphere(cloud)
+                if visible(sphere):
+                    lod = level(self.cloud_lod, (cloud['pos'][0], cloud['pos'][2]), sphere)
+                    self.draw_cloud(cloud['pos'], cloud['size'], lod, view)
             
         # Draw rain if stormy weather
         if self.weather == "storm":
             self.draw_rain()
 
-    def draw_cloud(self, position, size):
+    def draw_batched(self, frustum=None, stats=None, view=None):
+        # Pre-merged per-chunk VBOs: mountains, trees and clouds are one draw call each per chunk
+        if self.scenery_renderer is None:
+            self.scenery_renderer = SceneryRenderer()
+        self.scenery_renderer.sync(self.active_chunks)
+        self.scenery_renderer.draw(self.active_chunks, clouds=self.weather in ["cloudy", "storm"],
+                                   frustum=frustum, stats=stats, view=view)
+
+    def draw_cloud(self, position, size, lod=0, view=None):
         x, y, z = position
         glColor3f(0.9, 0.9, 0.9)  # White clouds
+        if lod == 2 and view is not None:
+            draw_billboard(view, x, y + size * 0.1, z, size * 0.9, size * 0.4)
+            return
         
         # Draw multiple spheres to create cloud shape
         for i in range(5):
@@ -212,18 +253,22 @@ class Environment:
             glPushMatrix()
             glTranslatef(x + offset_x, y + offset_y, z + offset_z)
             glScalef(size * 0.4, size * 0.3, size * 0.4)
-            self.draw_sphere()
+            self.draw_sphere(*CLOUD_SPHERE_STEPS[min(lod, 1)])
             glPopMatrix()
 
-    def draw_sphere(self):
+    def draw_sphere(self, lon_steps=8, lat_steps=4):
+        if meshes.USE_VBO:
+            meshes.draw_mesh(('sphere', lon_steps, lat_steps))
+            return
         # Simple sphere approximation
+        lon_step, lat_step = 360 / lon_steps, 180 / lat_steps
         glBegin(GL_QUADS)
-        for i in range(8):
-            for j in range(4):
-                angle1 = i * 45
-                angle2 = (i + 1) * 45
-                angle3 = j * 45
-                angle4 = (j + 1) * 45
+        for i in range(lon_steps):
+            for j in range(lat_steps):
+                angle1 = i * lon_step
+                angle2 = (i + 1) * lon_step
+                angle3 = j * lat_step
+                angle4 = (j + 1) * lat_step
                 
                 x1 = math.cos(math.radians(angle1)) * math.cos(math.radians(angle3))
                 y1 = math.sin(math.radians(angle3))
@@ -262,9 +307,6 @@ class Environment:
 
     def reset(self):
         """Reset the environment to initial state"""
-        self.mountains = []
-        self.trees = []
-        self.runways = []
-        self.last_player_pos = [0, 0, 0]
-        # Generate initial scenery
-        self.generate_scenery([0, 0, 0], mountain_count=20, tree_count=100) 
\ No newline at end of file
+        self.world.close()
+        self.world = World(self.world.seed, prepare=build_chunk_arrays)
+        self.load_around([0, 0, 0])
\ No newline at end of file
@@ -0,0 +1,441 @@
+import math
+from interpolation import SnapshotBuffer, lerp, lerp_angle
+from bullets import BulletPool
+
+BASE_TICK_RATE = 60  # Physics constants are tuned per 1/60 s step; other tick rates scale by k = dt * 60
+
+class PlaneModel:
+    """Flight model, bullets and network state of one plane. No OpenGL, pygame or audio,
+    so it also runs headless (see simulation.py); Plane adds drawing, input and sound."""
+
+    def __init__(self, x, y, z, plane_id=0):
+        self.initial_pos = (0, 1.7, 0)  # Start above the ground, y=1.7
+        self.x, self.y, self.z = self.initial_pos
+        self.name = "" # Add name attribute
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.yaw = 0.0
+        self.velocity = 0.0
+        self.thrust_level = 0.0
+        
+        self.pitch_rate = 0.0
+        self.roll_rate = 0.0
+        self.target_roll_angle = 0.0
+        
+        self.is_airborne = False  # Start on the ground
+        self.is_stalling = False
+        self.crash_sound_played = False
+        self.crash_timer = 0  # For crash animation
+
+        # Animation
+        self.propeller_angle = 0
+        
+        self.max_thrust = 0.013
+        self.drag = 0.00003
+        self.gravity = 0.005
+        self.ground_roll_resist_low = 0.999
+        self.ground_roll_resist_high = 0.9999
+        self.ground_turn_sensitivity = 0.2
+        self.ground_turn_sensitivity_high = 0.05
+        
+        self.size = 1.0
+        
+        # Animation
+        self.aileron_angle = 0
+        self.elevator_angle = 0
+
+        self.vertical_speed = 0
+        self.last_y = self.y
+        self.terrain = None  # Anything with height_at(x, z), e.g. the Environment; None is flat ground
+        
+        # New features
+        self.fuel = 100.0  # Fuel percentage
+        self.fuel_consumption = 0.1  # Reduced fuel consumption per frame
+        self.damage = 0.0  # Damage percentage
+        self.max_damage = 100.0
+        self.engine_health = 100.0
+        self.wing_health = 100.0
+        self.landing_gear_health = 100.0
+
+        self.flaps_deployed = False
+        self.flap_lift_bonus = 0.002
+        self.flap_drag_penalty = 0.0005
+        self.autopilot = False
+
+        self.brakes_applied = False
+        self.ground_turn_rate = 0
+
+        self.takeoff_speed = 0.28
+        self.ground_effect = False
+
+        self.lift_takeoff_boost = 0.006
+        self.taxi_blend_factor = 0.22
+        self.ground_velocity_x = 0.0
+        self.ground_velocity_z = 0.0
+
+        self.airborne_timer = 0  # Time spent airborne (frames)
+
+        self.bullets = BulletPool()  # Active bullets
+        self.last_shot_time = float('-inf')
+        self.shot_cooldown = 0.15  # seconds between shots
+        self.player_id = plane_id  # For multiplayer
+        self.net_buffer = SnapshotBuffer()  # Remote planes only: timestamped network states
+        self.health = 100
+        self.explosion_timer = 0
+        self.smoke_timer = 0
+        self.respawn_timer = 0
+        self.color = (0.8, 0.8, 0.8)  # Default color, can be set externally
+
+        self.max_speed_knots = 140
+        self.max_altitude_ft = 14000
+        self.firepower = 1
+
+        self.deaths = 0
+        self.sim_time = 0.0  # Seconds simulated so far; drives the shot cooldown
+        self.snap_render_state()
+
+    def snap_render_state(self):
+        # Pose at the previous simulation tick and the pose actually drawn this frame
+        self.prev_pose = (self.x, self.y, self.z, self.yaw, self.pitch, self.roll)
+        self.render_x, self.render_y, self.render_z = self.x, self.y, self.z
+        self.render_yaw, self.render_pitch, self.render_roll = self.yaw, self.pitch, self.roll
+
+    def save_render_state(self):
+        # Call before each simulation tick
+        self.prev_pose = (self.x, self.y, self.z, self.yaw, self.pitch, self.roll)
+
+    def interpolate_render_state(self, alpha):
+        # Blend between the last two ticks; alpha is how far the frame is into the next tick
+        x, y, z, yaw, pitch, roll = self.prev_pose
+        self.render_x = lerp(x, self.x, alpha)
+        self.render_y = lerp(y, self.y, alpha)
+        self.render_z = lerp(z, self.z, alpha)
+        self.render_yaw = lerp_angle(yaw, self.yaw, alpha)
+        self.render_pitch = lerp_angle(pitch, self.pitch, alpha)
+        self.render_roll = lerp_angle(roll, self.roll, alpha)
+
+    def set_properties_from_selection(self, plane_stats):
+        self.max_speed_knots = plane_stats['max_speed']
+        self.max_altitude_ft = plane_stats['max_altitude']
+        self.firepower = plane_stats['firepower']
+        self.color = plane_stats['color']
+
+    def update(self, other_planes=None, dt=1.0 / BASE_TICK_RATE):
+        if self.health <= 0:
+            self.update_destroyed(dt)
+            return
+        self.sim_time += dt
+        k = dt * BASE_TICK_RATE
+
+        ground_level = 1.7
+        # Always update orientation (pitch, roll)
+        self.pitch += self.pitch_rate * k
+        self.roll += (self.target_roll_angle - self.roll) * (1.0 - 0.95 ** k)
+        # Yaw update
+        if self.is_airborne:
+            effective_velocity = max(self.velocity, 0.3)
+            self.yaw += math.sin(math.radians(self.roll)) * effective_velocity * 1.0 * k
+        else:
+            self.yaw += self.ground_turn_rate * 1.5 * self.velocity * k
+        
+        # Clamp pitch and roll
+        self.roll = max(-65.0, min(65.0, self.roll))
+        self.pitch = max(-55.0, min(55.0, self.pitch))
+
+        # 2. Update Velocity
+        thrust_force = self.thrust_level * self.max_thrust
+        drag_force = self.drag * self.velocity * self.velocity
+        if not self.is_airborne:
+            drag_force += 0.01 * self.velocity 
+        self.velocity += (thrust_force - drag_force) * k
+        if self.velocity < 0: self.velocity = 0
+
+        # 3. Calculate new position based on orientation and velocity
+        yaw_rad = math.radians(self.yaw)
+        pitch_rad = math.radians(self.pitch)
+        fwd_x = math.sin(yaw_rad) * math.cos(pitch_rad)
+        fwd_y = math.sin(pitch_rad)
+        fwd_z = -math.cos(yaw_rad) * math.cos(pitch_rad)
+        self.x += self.velocity * fwd_x * k
+        self.y += self.velocity * fwd_y * k
+        self.z += self.velocity * fwd_z * k
+        
+        # 4. Handle Gravity and Ground Interaction
+        # Apply lift based on speed and pitch
+        lift = self.velocity * self.velocity * 0.002
+        if self.pitch > 0:
+            lift *= (1 + self.pitch / 20)
+        
+        # Takeoff logic
+        if not self.is_airborne and self.velocity > self.takeoff_speed and self.pitch > 1:
+            self.is_airborne = True
+            self.on_takeoff()
+        
+        if self.is_airborne:
+            self.y += lift * k
+            self.y -= self.gravity * k
+
+        self.vertical_speed = (self.y - self.last_y) / dt
+        self.last_y = self.y
+        
+        # Ground collision logic (for landing or if below ground)
+        if self.y < ground_level:
+            self.y = ground_level
+            self.is_airborne = False
+            self.roll = 0 # Level out on landing
+            if self.vertical_speed < -0.8: # Hard landing
+                self.health -= 60
+
+        # Flying into a mountain or tree destroys the plane
+        if self.terrain is not None:
+            terrain_height = self.terrain.height_at(self.x, self.z)
+            if self.y < terrain_height:
+                self.y = terrain_height
+                self.health = 0
+
+        # Fuel consumption
+        if self.thrust_level > 0:
+            self.fuel -= self.fuel_consumption * self.thrust_level * k
+            if self.fuel <= 0:
+                self.fuel = 0
+                self.thrust_level = 0  # Engine stops when out of fuel
+                
+        # Damage effects
+        if self.damage > 50:
+            # Reduced performance when damaged
+            self.max_thrust *= 0.8 ** k
+        if self.damage > 80:
+            # Critical damage - engine problems
+            self.engine_health -= 0.1 * k
+            if self.engine_health < 20:
+                self.thrust_level *= 0.5 ** k  # Reduced thrust
+        
+        # Animate propeller (spin faster with more thrust)
+        self.propeller_angle += self.thrust_level * 100 * k
+        if self.propeller_angle > 360.0:
+            self.propeller_angle -= 360.0
+
+        # Animate wheels (spin when on ground, stop in air)
+        if self.y <= 0.6 and self.velocity > 0:
+            if not hasattr(self, 'wheel_angle'):
+                self.wheel_angle = 0.0
+            self.wheel_angle += self.velocity * 60 * k  # Spin rate proportional to speed
+            if self.wheel_angle > 360.0:
+                self.wheel_angle -= 360.0
+        else:
+            if not hasattr(self, 'wheel_angle'):
+                self.wheel_angle = 0.0
+
+        # Update bullets
+        hit_events = [] # To be returned and sent over network
+        for plane, damage in self.bullets.step(other_planes, k):
+            hit_event = {
+                'type': 'hit',
+                'target_id': plane.player_id,
+                'attacker_id': self.player_id,
+                'damage': damage
+            }
+            # Check for a kill
+            if plane.health - damage <= 0:
+                hit_event['is_kill'] = True
+                hit_event['victim_name'] = getattr(plane, 'name', str(plane.player_id))
+            hit_events.append(hit_event)
+
+        # Stall detection
+        was_stalling = self.is_stalling
+        if self.is_airborne and (self.velocity < self.takeoff_speed * 0.8 or abs(self.pitch) > 25):
+            self.is_stalling = True
+            if not was_stalling:
+                self.on_stall()
+        else:
+            self.is_stalling = False
+            
+        return hit_events
+
+    def update_destroyed(self, dt=1.0 / BASE_TICK_RATE):
+        # Timers count 1/60 s frames
+        self.sim_time += dt
+        k = dt * BASE_TICK_RATE
+        if self.explosion_timer == 0 and self.smoke_timer == 0: # First time
+            self.explosion_timer = 40
+            self.smoke_timer = 120
+            self.respawn_timer = 120
+        
+        if self.explosion_timer > 0:
+            self.explosion_timer = max(0, self.explosion_timer - k)
+        elif self.smoke_timer > 0: # After explosion, smoke
+            self.smoke_timer = max(0, self.smoke_timer - k)
+
+        if self.respawn_timer > 0:
+            self.respawn_timer = max(0, self.respawn_timer - k)
+        else:
+            self.respawn()
+
+    def calculate_wing_slope(self):
+        # Smoothly interpolate the roll angle to the target angle
+        self.roll += (self.target_roll_angle - self.roll) * 0.05
+
+    def apply_controls(self, throttle=0, pitch=0, roll=0, flaps=False, brakes=False, fire=False, dt=1.0 / BASE_TICK_RATE):
+        # throttle, pitch and roll are -1, 0 or 1, like keys held down
+        if self.health <= 0 and self.respawn_timer > 0:
+            return  # Ignore input while destroyed
+        k = dt * BASE_TICK_RATE
+        self.thrust_level += 0.01 * throttle * k
+        # Clamp throttle after input
+        self.thrust_level = max(0.0, min(1.0, self.thrust_level))
+
+        # Ground movement controls
+        if not self.is_airborne:
+            self.ground_turn_rate = 1.0 * roll
+
+        # Always allow pitch control (for takeoff rotation)
+        self.pitch_rate = 0.5 * pitch
+        self.elevator_angle = 20.0 * pitch
+
+        # Roll/aileron animation (always animate wings for feedback)
+        self.target_roll_angle = 30.0 * roll
+        self.aileron_angle = 20.0 * roll
+
+        self.flaps_deployed = flaps
+        self.brakes_applied = brakes
+        if fire:
+            self.fire()
+
+    def fire(self):
+        # Fire a bullet from the nose (propeller position), at most once per shot_cooldown
+        if self.sim_time - self.last_shot_time <= self.shot_cooldown:
+            return False
+        # Nose offset in local plane coordinates: (0, 0, -2.6)
+        nose_offset = -2.6
+        yaw_rad = math.radians(self.yaw)
+        pitch_rad = math.radians(self.pitch)
+
+        # Calculate the forward vector
+        fwd_x = math.sin(yaw_rad) * math.cos(pitch_rad)
+        fwd_y = math.sin(pitch_rad)
+        fwd_z = -math.cos(yaw_rad) * math.cos(pitch_rad)
+
+        # Calculate world position of the nose
+        nose_x = self.x + fwd_x * nose_offset
+        nose_y = self.y + fwd_y * nose_offset
+        nose_z = self.z + fwd_z * nose_offset
+
+        self.bullets.spawn(nose_x, nose_y, nose_z, self.yaw, self.pitch,
+                           self.player_id, self.firepower * 10)
+        self.last_shot_time = self.sim_time
+        self.on_fire()
+        return True
+
+    # Hooks for presentation (sound) in subclasses; the model itself stays silent
+    def on_takeoff(self):
+        pass
+
+    def on_stall(self):
+        pass
+
+    def on_fire(self):
+        pass
+
+    def reset(self):
+        self.x, self.y, self.z = self.initial_pos
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.yaw = 0.0
+        self.velocity = 0.0
+        self.thrust_level = 0.0
+
+        self.pitch_rate = 0.0
+        self.roll_rate = 0.0
+        self.target_roll_angle = 0.0
+        
+        self.is_airborne = False  # Reset to ground
+        self.is_stalling = False
+        self.crash_sound_played = False
+        self.crash_timer = 0
+
+        # Animation
+        self.propeller_angle = 0
+        self.aileron_angle = 0
+        self.elevator_angle = 0
+        self.ground_turn_rate = 0
+        
+        self.vertical_speed = 0
+        self.last_y = self.y
+
+        # New features
+        self.fuel = 100.0  # Fuel percentage
+        self.fuel_consumption = 0.005  # Fuel consumption per frame
+        self.damage = 0.0  # Damage percentage
+        self.max_damage = 100.0
+        self.engine_health = 100.0
+        self.wing_health = 100.0
+        self.landing_gear_health = 100.0
+
+        self.brakes_applied = False
+
+        self.ground_velocity_x = 0.0
+        self.ground_velocity_z = 0.0
+
+        self.bullets = BulletPool()  # Active bullets
+        self.last_shot_time = float('-inf')
+        self.shot_cooldown = 0.15  # seconds between shots
+        self.respawn_timer = 0
+        self.snap_render_state()
+
+    def respawn(self):
+        self.deaths += 1
+        self.x, self.y, self.z = self.initial_pos
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.yaw = 0.0
+        self.velocity = 0.0
+        self.thrust_level = 0.0
+        self.health = 100
+        self.explosion_timer = 0
+        self.smoke_timer = 0
+        self.respawn_timer = 0
+        self.bullets.clear()
+        self.pitch_rate = 0.0
+        self.roll_rate = 0.0
+        self.target_roll_angle = 0.0
+        self.is_airborne = False
+        self.is_stalling = False
+        self.crash_sound_played = False
+        self.crash_timer = 0
+        self.propeller_angle = 0
+        self.aileron_angle = 0
+        self.elevator_angle = 0
+        self.ground_turn_rate = 0
+        self.vertical_speed = 0
+        self.last_y = self.y
+        self.fuel = 100.0
+        self.fuel_consumption = 0.005
+        self.damage = 0.0
+        self.max_damage = 100.0
+        self.engine_health = 100.0
+        self.wing_health = 100.0
+        self.landing_gear_health = 100.0
+        self.flaps_deployed = False
+        self.flap_lift_bonus = 0.002
+        self.flap_drag_penalty = 0.0005
+        self.autopilot = False
+        self.brakes_applied = False
+        self.ground_velocity_x = 0.0
+        self.ground_velocity_z = 0.0
+        self.airborne_timer = 0
+        self.last_shot_time = float('-inf')
+        self.shot_cooldown = 0.15
+        self.snap_render_state()
+
+    def network_update(self, data, timestamp):
+        # Buffer a remote state; the pose is applied later by apply_network_state
+        last = self.net_buffer.samples[-1][1] if self.net_buffer.samples else (self.x, self.y, self.z, self.yaw, self.pitch, self.roll)
+        self.net_buffer.push(timestamp, (
+            data.get('x', last[0]), data.get('y', last[1]), data.get('z', last[2]),
+            data.get('yaw', last[3]), data.get('pitch', last[4]), data.get('roll', last[5])))
+
+    def apply_network_state(self, render_time):
+        pose = self.net_buffer.sample(render_time)
+        if pose is not None:
+            self.x, self.y, self.z, self.yaw, self.pitch, self.roll = pose
+            self.snap_render_state()
@@ -0,0 +1,161 @@
+import pygame
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+from collections import OrderedDict
+
+ATLAS_SIZE = 512
+GLYPH_PADDING = 1
+STRING_CACHE_SIZE = 256  # Max number of laid-out strings kept around
+
+_fonts = {}
+_atlases = {}
+_string_cache = OrderedDict()
+
+def get_font(font_size):
+    font = _fonts.get(font_size)
+    if font is None:
+        font = pygame.font.Font(None, font_size)
+        _fonts[font_size] = font
+    return font
+
+class GlyphAtlas:
+    def __init__(self, font_size):
+        self.font = get_font(font_size)
+        self.surface = pygame.Surface((ATLAS_SIZE, ATLAS_SIZE), pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self.glyphs = {}  # char -> (width, height, advance, u0, v0, u1, v1)
+        self.line_height = self.font.get_height()
+        self.pen_x = 0
+        self.pen_y = 0
+        self.texture = None
+        self.dirty = True
+        for code in range(32, 127):
+            self.add_glyph(chr(code))
+
+    def add_glyph(self, char):
+        surface = self.font.render(char, True, (255, 255, 255))
+        w, h = surface.get_size()
+        if self.pen_x + w + GLYPH_PADDING > ATLAS_SIZE:
+            self.pen_x = 0
+            self.pen_y += self.line_height + GLYPH_PADDING
+        if self.pen_y + h > ATLAS_SIZE:
+            return None  # Atlas is full
+        self.surface.blit(surface, (self.pen_x, self.pen_y))
+        metrics = self.font.metrics(char)
+        advance = metrics[0][4] if metrics and metrics[0] else w
+        # The atlas is uploaded flipped, so v runs bottom-up
+        u0 = self.pen_x / ATLAS_SIZE
+        u1 = (self.pen_x + w) / ATLAS_SIZE
+        v0 = 1.0 - (self.pen_y + h) / ATLAS_SIZE
+        v1 = 1.0 - self.pen_y / ATLAS_SIZE
+        glyph = (w, h, advance, u0, v0, u1, v1)
+        self.glyphs[char] = glyph
+        self.pen_x += w + GLYPH_PADDING
+        self.dirty = True
+        return glyph
+
+    def get_glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.add_glyph(char) or self.glyphs['?']
+        return glyph
+
+    def bind(self):
+        if self.texture is None:
+            self.texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        else:
+            glBindTexture(GL_TEXTURE_2D, self.texture)
+        if self.dirty:
+            data = pygame.image.tostring(self.surface, "RGBA", True)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ATLAS_SIZE, ATLAS_SIZE, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            self.dirty = False
+
+    def layout(self, text):
+        # Interleaved x, y, u, v for one quad per character, origin at bottom-left
+        vertices = np.empty((len(text) * 4, 4), dtype=np.float32)
+        pen = 0.0
+        for i, char in enumerate(text):
+            w, h, advance, u0, v0, u1, v1 = self.get_glyph(char)
+            vertices[i * 4:i * 4 + 4] = [
+                (pen, 0, u0, v0),
+                (pen + w, 0, u1, v0),
+                (pen + w, h, u1, v1),
+                (pen, h, u0, v1),
+            ]
+            pen += advance
+        return vertices
+
+def get_atlas(font_size):
+    atlas = _atlases.get(font_size)
+    if atlas is None:
+        atlas = GlyphAtlas(font_size)
+        _atlases[font_size] = atlas
+    return atlas
+
+def build_atlases(font_sizes):
+    # Upload for AssetManager.load: renders and uploads one size per step. Fonts are
+    # main-thread only (pygame.font isn't thread safe), so there is no decode half.
+    atlases = []
+    for size in font_sizes:
+        atlas = get_atlas(size)
+        atlas.bind()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        atlases.append(atlas)
+        yield
+    return atlases
+
+def get_string(text, font_size):
+    # LRU cache of laid-out strings so static HUD labels are only built once
+    key = (text, font_size)
+    vertices = _string_cache.get(key)
+    if vertices is None:
+        vertices = get_atlas(font_size).layout(text)
+        _string_cache[key] = vertices
+        if len(_string_cache) > STRING_CACHE_SIZE:
+            _string_cache.popitem(last=False)
+    else:
+        _string_cache.move_to_end(key)
+    return vertices
+
+def draw_string(x, y, text, font_size=24, color=(1.0, 1.0, 1.0, 1.0)):
+    if not text:
+        return
+    atlas = get_atlas(font_size)
+    vertices = get_string(text, font_size)
+
+    glPushAttrib(GL_ENABLE_BIT | GL_CURRENT_BIT | GL_COLOR_BUFFER_BIT | GL_TEXTURE_BIT)
+    glDisable(GL_LIGHTING)
+    glDisable(GL_DEPTH_TEST)
+    glEnable(GL_TEXTURE_2D)
+    glEnable(GL_BLEND)
+    glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)  # Same as utils.enable_blend
+    glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+    glColor4f(*color)
+    atlas.bind()
+
+    glPushMatrix()
+    glTranslatef(x, y, 0)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+    address = vertices.ctypes.data
+    glVertexPointer(2, GL_FLOAT, 16, ctypes.c_void_p(address))
+    glTexCoordPointer(2, GL_FLOAT, 16, ctypes.c_void_p(address + 8))
+    glDrawArrays(GL_QUADS, 0, len(vertices))
+    glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPopMatrix()
+
+    glBindTexture(GL_TEXTURE_2D, 0)
+    glPopAttrib()
+
+def clear_cache():
+    # Call when the GL context is recreated
+    for atlas in _atlases.values():
+        if atlas.texture is not None:
+            glDeleteTextures([atlas.texture])
+    _atlases.clear()
+    _string_cache.clear()
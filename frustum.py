@@ -0,0 +1,68 @@
+import math
+import numpy as np
+from OpenGL.GL import glGetFloatv, GL_PROJECTION_MATRIX, GL_MODELVIEW_MATRIX
+
+class Frustum:
+    """The six clip planes of a view as (a, b, c, d), with a*x + b*y + c*z + d >= 0 inside.
+    Objects are tested as bounding spheres or boxes before any GL call is made for them."""
+
+    def __init__(self, clip):
+        # clip = projection * modelview, in the usual column-vector form
+        rows = [clip[3] + clip[0], clip[3] - clip[0],  # left, right
+                clip[3] + clip[1], clip[3] - clip[1],  # bottom, top
+                clip[3] + clip[2], clip[3] - clip[2]]  # near, far
+        self.planes = [tuple(r / np.linalg.norm(r[:3])) for r in rows]
+
+    @classmethod
+    def from_gl(cls):
+        # GL hands matrices back column-major, so the arrays come out transposed
+        projection = np.asarray(glGetFloatv(GL_PROJECTION_MATRIX), dtype=np.float64).reshape(4, 4).T
+        modelview = np.asarray(glGetFloatv(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(4, 4).T
+        return cls(projection @ modelview)
+
+    def sphere_visible(self, x, y, z, radius):
+        for a, b, c, d in self.planes:
+            if a * x + b * y + c * z + d < -radius:
+                return False
+        return True
+
+    def box_visible(self, lo, hi):
+        # Tests the box corner furthest along each plane's normal
+        for a, b, c, d in self.planes:
+            x = hi[0] if a > 0 else lo[0]
+            y = hi[1] if b > 0 else lo[1]
+            z = hi[2] if c > 0 else lo[2]
+            if a * x + b * y + c * z + d < 0:
+                return False
+        return True
+
+class CullStats:
+    """Objects and chunks kept or rejected by the frustum this frame, for the HUD."""
+
+    def __init__(self):
+        self.visible = 0
+        self.culled = 0
+
+    def reset(self):
+        self.visible = 0
+        self.culled = 0
+
+    def count(self, visible):
+        if visible:
+            self.visible += 1
+        else:
+            self.culled += 1
+        return visible
+
+def mountain_sphere(mountain):
+    x, _, z = mountain['pos']
+    height, base = mountain['height'], mountain['base']
+    return x, height / 2, z, math.hypot(base * math.sqrt(2), height / 2)
+
+def tree_sphere(tree):
+    x, _, z = tree
+    return x, 2.5, z, 2.5
+
+def cloud_sphere(cloud):
+    x, y, z = cloud['pos']
+    return x, y, z, cloud['size'] * 1.5
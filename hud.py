@@ -0,0 +1,78 @@
+from render_target import RenderTarget
+
+class Widget:
+    """One retained piece of the HUD. value() is polled every frame and draw(value) only runs
+    when some number in it moved more than tolerance (or anything else changed) since the
+    last draw. A value of None hides the widget. rect is (x, y, width, height) in screen pixels."""
+
+    def __init__(self, rect, value, draw, tolerance=0):
+        self.rect = rect
+        self.value = value
+        self.draw = draw
+        self.tolerance = tolerance
+        self.shown = None
+        self.drawn = False
+
+    def changed(self, value):
+        if not self.drawn:
+            return True
+        if value is None or self.shown is None or len(value) != len(self.shown):
+            return value != self.shown
+        for old, new in zip(self.shown, value):
+            if isinstance(new, (int, float)) and isinstance(old, (int, float)):
+                if abs(new - old) > self.tolerance:
+                    return True
+            elif new != old:
+                return True
+        return False
+
+class HudLayer:
+    """2D overlay kept in a screen-sized offscreen texture. Only widgets whose values changed
+    are redrawn into it (their rects must not overlap); the layer then goes on screen in one
+    draw call, with one textured quad per visible widget so empty screen isn't blended."""
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.widgets = {}  # name -> Widget, drawn in insertion order
+        self.target = None  # Created on the first update, once a GL context exists
+        self.redrawn = 0  # Widgets redrawn by the last update()
+
+    def add(self, name, rect, value, draw, tolerance=0):
+        self.widgets[name] = Widget(rect, value, draw, tolerance)
+
+    def invalidate(self):
+        for widget in self.widgets.values():
+            widget.drawn = False
+
+    def update(self):
+        dirty = []
+        for widget in self.widgets.values():
+            value = widget.value()
+            if widget.changed(value):
+                dirty.append((widget, value))
+        self.redrawn = len(dirty)
+        if not dirty:
+            return
+        if self.target is None:
+            self.target = RenderTarget(self.width, self.height)
+            self.target.begin()
+            self.target.clear()
+        else:
+            self.target.begin()
+        for widget, value in dirty:
+            self.target.clear(*widget.rect)
+            if value is not None:
+                widget.draw(value)
+            widget.shown = value
+            widget.drawn = True
+        self.target.end()
+
+    def draw(self):
+        if self.target is not None:
+            self.target.draw_rects([w.rect for w in self.widgets.values() if w.shown is not None])
+
+    def release(self):
+        if self.target is not None:
+            self.target.release()
+            self.target = None
+        self.invalidate()
@@ -1,193 +1,195 @@
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import pygame
 import math
+from utils import draw_text
+from render_target import RenderTarget
 
-def draw_text(x, y, text, font):
-    text_surface = font.render(text, True, (255, 255, 255, 255))
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-    glWindowPos2d(x, y)
-    glDrawPixels(text_surface.get_width(), text_surface.get_height(), GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+# Atlas cells, one instrument_size square each: the six dial faces, then the parts that move
+# as a whole (heading card) or sit on top of the horizon (attitude symbol)
+ATLAS_CELLS = ['ASI', 'ATT', 'ALT', 'TC', 'HDG', 'VSI', 'CARD', 'SYMBOL']
+DIAL_SLOTS = {'ASI': (0, 1), 'ATT': (1, 1), 'ALT': (2, 1), 'TC': (0, 0), 'HDG': (1, 0), 'VSI': (2, 0)}  # (column, row)
+TICK_COUNTS = {'ASI': 12, 'ALT': 10, 'VSI': 12}
 
 class Instruments:
+    """Six round gauges. Faces, ticks, labels and the heading card are baked once into a
+    texture atlas; each frame only the horizon, the needles and a few textured quads are drawn."""
+
     def __init__(self, x, y, size):
         self.x = x
         self.y = y
         self.instrument_size = size
         self.padding = 5 # Reduced padding
-        self.font = pygame.font.Font(None, 18) # Smaller font
-
-    def draw(self, plane):
-        # Top Row
-        glPushMatrix()
-        glTranslatef(self.x, self.y + self.instrument_size + self.padding, 0)
-        self.draw_airspeed_indicator(plane.velocity * 120)
-        glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(self.x + self.instrument_size + self.padding, self.y + self.instrument_size + self.padding, 0)
-        self.draw_attitude_indicator(plane.pitch, plane.roll)
-        glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(self.x + 2 * (self.instrument_size + self.padding), self.y + self.instrument_size + self.padding, 0)
-        self.draw_altimeter(plane.y * 3.28084)
-        glPopMatrix()
-
-        # Bottom Row
-        glPushMatrix()
-        glTranslatef(self.x, self.y, 0)
-        self.draw_turn_coordinator(plane.roll, (math.sin(math.radians(plane.roll)) * plane.velocity * 0.3))
-        glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(self.x + self.instrument_size + self.padding, self.y, 0)
-        self.draw_heading_indicator(plane.yaw)
-        glPopMatrix()
-
-        glPushMatrix()
-        glTranslatef(self.x + 2 * (self.instrument_size + self.padding), self.y, 0)
-        self.draw_vertical_speed_indicator(plane.vertical_speed)
-        glPopMatrix()
-
-    def draw_background(self, label):
+        self.font_size = 18 # Smaller font
+        self.atlas = None  # Baked on the first draw, once a GL context exists
+
+    def resize(self, x, y, size):
+        self.x, self.y = x, y
+        if size != self.instrument_size:
+            self.instrument_size = size
+            self.release()
+
+    def release(self):
+        if self.atlas is not None:
+            self.atlas.release()
+            self.atlas = None
+
+    def dial_origin(self, name):
+        column, row = DIAL_SLOTS[name]
+        step = self.instrument_size + self.padding
+        return self.x + column * step, self.y + row * step
+
+    def cell_uv(self, name):
+        i = ATLAS_CELLS.index(name)
+        cell = self.atlas.height
+        return i * cell / self.atlas.width, 0.0, (i * cell + self.instrument_size) / self.atlas.width, self.instrument_size / cell
+
+    def bake(self):
+        cell = math.ceil(self.instrument_size)
+        self.atlas = RenderTarget(cell * len(ATLAS_CELLS), cell)
+        self.atlas.begin()
+        self.atlas.clear()
+        for i, name in enumerate(ATLAS_CELLS):
+            glPushMatrix()
+            glTranslatef(i * cell, 0, 0)
+            if name == 'CARD':
+                self.bake_heading_card()
+            elif name == 'SYMBOL':
+                self.bake_attitude_symbol()
+            else:
+                self.bake_face('' if name == 'ATT' else name, TICK_COUNTS.get(name, 0))
+            glPopMatrix()
+        self.atlas.end()
+
+    def bake_face(self, label, ticks):
         radius = self.instrument_size / 2
-        
-        # Draw background circle
         glColor3f(0.2, 0.2, 0.2)
         glBegin(GL_POLYGON)
         for i in range(100):
             angle = 2 * math.pi * i / 100
-            glVertex2f(radius + radius * math.cos(angle), 
+            glVertex2f(radius + radius * math.cos(angle),
                        radius + radius * math.sin(angle))
         glEnd()
-        
-        # Draw label
-        draw_text(radius - 10, self.instrument_size - 20, label, self.font)
-        
-        return radius
-    
-    def draw_needle(self, radius, angle, length, width):
-        glPushMatrix()
-        glTranslatef(radius, radius, 0)
-        glRotatef(-angle, 0, 0, 1)
-        glColor3f(1.0, 1.0, 1.0)
-        glLineWidth(width)
+        if ticks:
+            glColor3f(0.7, 0.7, 0.7)
+            glLineWidth(1.0)
+            glBegin(GL_LINES)
+            for i in range(ticks):
+                angle = 2 * math.pi * i / ticks
+                for r in (radius * 0.85, radius * 0.97):
+                    glVertex2f(radius + r * math.sin(angle), radius + r * math.cos(angle))
+            glEnd()
+        if label:
+            draw_text(radius - 10, self.instrument_size - 20, label, self.font_size)
+
+    def bake_heading_card(self):
+        radius = self.instrument_size / 2
+        for letter, degrees in (('N', 0), ('E', 90), ('S', 180), ('W', 270)):
+            angle = math.radians(degrees)
+            x = radius * 0.8 * math.sin(angle)
+            y = radius * 0.8 * math.cos(angle)
+            draw_text(radius + x - 5, radius + y - 5, letter, self.font_size)
+
+    def bake_attitude_symbol(self):
+        radius = self.instrument_size / 2
+        glColor3f(1.0, 1.0, 0.0)
+        glLineWidth(2.0)
         glBegin(GL_LINES)
-        glVertex2f(0, 0)
-        glVertex2f(0, length)
+        # Wings
+        glVertex2f(radius - 30, radius)
+        glVertex2f(radius + 30, radius)
         glEnd()
-        glPopMatrix()
-
-    def draw_attitude_indicator(self, pitch, roll):
-        instrument_radius = self.instrument_size / 2
-        
-        glPushMatrix()
-        
-        # Draw background circle
-        glColor3f(0.2, 0.2, 0.2)
-        glBegin(GL_POLYGON)
-        for i in range(100):
-            angle = 2 * math.pi * i / 100
-            glVertex2f(instrument_radius + instrument_radius * math.cos(angle), 
-                       instrument_radius + instrument_radius * math.sin(angle))
+        # Fuselage dot
+        glBegin(GL_POINTS)
+        glVertex2f(radius, radius)
         glEnd()
 
-        # Artificial Horizon
+    def draw(self, plane):
+        if self.atlas is None:
+            self.bake()
+        size = self.instrument_size
+        radius = size / 2
+
+        # Dial faces: one textured quad each, one draw call
+        quads = []
+        for name in DIAL_SLOTS:
+            x, y = self.dial_origin(name)
+            quads.append((x, y, size, size) + self.cell_uv(name))
+        self.atlas.draw_quads(quads)
+
+        self.draw_horizon(plane.pitch, plane.roll)
+
+        # Heading card turned with the plane, attitude symbol over the horizon
+        hx, hy = self.dial_origin('HDG')
+        ax, ay = self.dial_origin('ATT')
+        corners = self.rotated_cell('CARD', hx + radius, hy + radius, -plane.yaw)
+        u0, v0, u1, v1 = self.cell_uv('SYMBOL')
+        corners += [(u0, v0, ax, ay), (u1, v0, ax + size, ay), (u1, v1, ax + size, ay + size), (u0, v1, ax, ay + size)]
+        self.atlas.draw_corners(corners)
+
+        self.draw_needles(plane)
+
+    def rotated_cell(self, name, cx, cy, angle):
+        # Corners of an atlas cell drawn centred on (cx, cy) and turned clockwise by angle degrees
+        u0, v0, u1, v1 = self.cell_uv(name)
+        half = self.instrument_size / 2
+        corners = []
+        for u, v, dx, dy in ((u0, v0, -half, -half), (u1, v0, half, -half), (u1, v1, half, half), (u0, v1, -half, half)):
+            x, y = rotate(dx, dy, angle)
+            corners.append((u, v, cx + x, cy + y))
+        return corners
+
+    def draw_horizon(self, pitch, roll):
+        x, y = self.dial_origin('ATT')
+        radius = self.instrument_size / 2
+        glPushAttrib(GL_SCISSOR_BIT | GL_ENABLE_BIT | GL_CURRENT_BIT)
         glEnable(GL_SCISSOR_TEST)
-        glScissor(int(self.x), int(self.y), self.instrument_size, self.instrument_size)
-        
+        glScissor(int(x), int(y), int(self.instrument_size), int(self.instrument_size))
         glPushMatrix()
-        glTranslatef(instrument_radius, instrument_radius, 0)
+        glTranslatef(x + radius, y + radius, 0)
         glRotatef(-roll, 0, 0, 1)
-        
+        glBegin(GL_QUADS)
         # Sky
         glColor3f(0.3, 0.5, 0.8)
-        glBegin(GL_QUADS)
         glVertex2f(-self.instrument_size, pitch * 2)
         glVertex2f(self.instrument_size, pitch * 2)
         glVertex2f(self.instrument_size, self.instrument_size)
         glVertex2f(-self.instrument_size, self.instrument_size)
-        glEnd()
-        
         # Ground
         glColor3f(0.6, 0.4, 0.2)
-        glBegin(GL_QUADS)
         glVertex2f(-self.instrument_size, -self.instrument_size)
         glVertex2f(self.instrument_size, -self.instrument_size)
         glVertex2f(self.instrument_size, pitch * 2)
         glVertex2f(-self.instrument_size, pitch * 2)
         glEnd()
-        
         glPopMatrix()
-        glDisable(GL_SCISSOR_TEST)
-
-        # Draw fixed plane symbol
-        glColor3f(1.0, 1.0, 0.0)
-        glLineWidth(2.0)
-        glBegin(GL_LINES)
-        # Wings
-        glVertex2f(instrument_radius - 30, instrument_radius)
-        glVertex2f(instrument_radius + 30, instrument_radius)
-        # Fuselage dot
-        glEnd()
-        glBegin(GL_POINTS)
-        glVertex2f(instrument_radius, instrument_radius)
-        glEnd()
+        glPopAttrib()
 
-        glPopMatrix() 
-
-    def draw_airspeed_indicator(self, airspeed):
-        radius = self.draw_background("ASI")
-        # Draw airspeed markings and needle
-        # (Simplified for now)
-        angle = airspeed * 1.5 # Scale factor
-        self.draw_needle(radius, angle, radius * 0.9, 2.0)
-
-    def draw_altimeter(self, altitude):
-        radius = self.draw_background("ALT")
-        # Simplified: one needle for hundreds of feet
-        angle = (altitude % 1000) / 1000 * 360
-        self.draw_needle(radius, angle, radius * 0.9, 2.0)
-        # Thousands needle
-        angle_1000 = (altitude / 10000) * 360
-        self.draw_needle(radius, angle_1000, radius * 0.6, 3.0)
-
-    def draw_turn_coordinator(self, roll, turn_rate):
-        radius = self.draw_background("TC")
-        glPushMatrix()
-        glTranslatef(radius, radius, 0)
-        glRotatef(-roll, 0, 0, 1)
-        # Draw small plane symbol
+    def draw_needles(self, plane):
+        # Every needle and the turn coordinator's plane as white quads in one glBegin/glEnd
+        radius = self.instrument_size / 2
+        altitude = plane.y * 3.28084
+        needles = [
+            ('ASI', plane.velocity * 120 * 1.5, 0.9, 2.0),
+            ('ALT', (altitude % 1000) / 1000 * 360, 0.9, 2.0),
+            ('ALT', (altitude / 10000) * 360, 0.6, 3.0),  # Thousands
+            ('HDG', 0, 0.9, 2.0),  # Fixed lubber line; the card turns instead
+            ('VSI', -plane.vertical_speed * 0.5, 0.9, 2.0),
+        ]
         glColor3f(1.0, 1.0, 1.0)
-        glBegin(GL_TRIANGLES)
-        glVertex2f(0, 10)
-        glVertex2f(-10, -5)
-        glVertex2f(10, -5)
+        glBegin(GL_QUADS)
+        for name, angle, length, width in needles:
+            x, y = self.dial_origin(name)
+            for dx, dy in ((-width / 2, 0), (width / 2, 0), (width / 2, radius * length), (-width / 2, radius * length)):
+                px, py = rotate(dx, dy, angle)
+                glVertex2f(x + radius + px, y + radius + py)
+        # Turn coordinator: small plane banked with the roll (a triangle, apex doubled)
+        x, y = self.dial_origin('TC')
+        for dx, dy in ((0, 10), (-10, -5), (10, -5), (0, 10)):
+            px, py = rotate(dx, dy, plane.roll)
+            glVertex2f(x + radius + px, y + radius + py)
         glEnd()
-        glPopMatrix()
 
-    def draw_heading_indicator(self, yaw):
-        radius = self.draw_background("HDG")
-        glPushMatrix()
-        glTranslatef(radius, radius, 0)
-        glRotatef(yaw, 0, 0, 1)
-        
-        # Draw compass markings
-        cardinals = {'N': 0, 'E': 90, 'S': 180, 'W': 270}
-        for_each = ['N', 'E', 'S', 'W']
-        for p in for_each:
-            angle = math.radians(cardinals[p])
-            x = radius * 0.8 * math.sin(angle)
-            y = radius * 0.8 * math.cos(angle)
-            draw_text(radius + x - 5, radius + y - 5, p, self.font)
-        
-        glPopMatrix()
-        # Draw fixed needle
-        self.draw_needle(radius, 0, radius * 0.9, 2.0)
-
-    def draw_vertical_speed_indicator(self, vsi):
-        radius = self.draw_background("VSI")
-        # vsi is in ft/sec, scale it for the gauge
-        angle = -vsi * 0.5
-        self.draw_needle(radius, angle, radius * 0.9, 2.0) 
\ No newline at end of file
+def rotate(x, y, angle):
+    # Clockwise by angle degrees, like glRotatef(-angle, 0, 0, 1)
+    a = math.radians(angle)
+    return x * math.cos(a) + y * math.sin(a), -x * math.sin(a) + y * math.cos(a)
@@ -0,0 +1,91 @@
+import collections
+import threading
+import time
+
+INTERPOLATION_DELAY = 0.1  # Seconds remote planes are rendered behind the newest data
+MAX_EXTRAPOLATION = 0.5  # Seconds of dead reckoning before a late plane freezes
+BUFFER_SIZE = 32
+CLOCK_DRIFT_RATE = 0.01  # How fast the clock offset follows packets that arrive late
+
+def now():
+    return time.monotonic()
+
+def render_time():
+    return now() - INTERPOLATION_DELAY
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+def lerp_angle(a, b, t):
+    # Interpolate along the shortest arc
+    diff = (b - a + 180.0) % 360.0 - 180.0
+    return a + diff * t
+
+class SnapshotClock:
+    """Maps server snapshot times onto the local clock, smoothing out arrival jitter."""
+
+    def __init__(self):
+        self.offset = None
+
+    def local_time(self, server_time, arrival=None):
+        if arrival is None:
+            arrival = now()
+        sample = arrival - server_time
+        if self.offset is None or sample < self.offset:
+            self.offset = sample  # Least-delayed packet seen so far
+        else:
+            self.offset += (sample - self.offset) * CLOCK_DRIFT_RATE
+        return server_time + self.offset
+
+class SnapshotBuffer:
+    """Timestamped ring buffer of (x, y, z, yaw, pitch, roll) for one remote plane."""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.samples = collections.deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def push(self, timestamp, state):
+        with self.lock:
+            if self.samples and timestamp <= self.samples[-1][0]:
+                return  # Out of order or duplicate
+            self.samples.append((timestamp, tuple(state)))
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def sample(self, t):
+        with self.lock:
+            samples = list(self.samples)
+        if not samples:
+            return None
+        if t <= samples[0][0]:
+            return samples[0][1]
+        newest_time, newest = samples[-1]
+        if t >= newest_time:
+            return self.extrapolate(samples, t)
+        # Newest pair that brackets t
+        for i in range(len(samples) - 1, 0, -1):
+            t0, a = samples[i - 1]
+            t1, b = samples[i]
+            if t0 <= t <= t1:
+                f = (t - t0) / (t1 - t0)
+                return (lerp(a[0], b[0], f), lerp(a[1], b[1], f), lerp(a[2], b[2], f),
+                        lerp_angle(a[3], b[3], f), lerp_angle(a[4], b[4], f), lerp_angle(a[5], b[5], f))
+        return newest
+
+    def extrapolate(self, samples, t):
+        # Dead reckoning from the last two samples, capped at MAX_EXTRAPOLATION
+        newest_time, newest = samples[-1]
+        if len(samples) < 2:
+            return newest
+        prev_time, prev = samples[-2]
+        span = newest_time - prev_time
+        ahead = min(t - newest_time, MAX_EXTRAPOLATION)
+        f = ahead / span
+        return (newest[0] + (newest[0] - prev[0]) * f,
+                newest[1] + (newest[1] - prev[1]) * f,
+                newest[2] + (newest[2] - prev[2]) * f,
+                lerp_angle(prev[3], newest[3], 1.0 + f),
+                newest[4],
+                newest[5])
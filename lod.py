@@ -0,0 +1,81 @@
+import math
+import numpy as np
+from OpenGL.GL import glGetFloatv, glGetIntegerv, GL_PROJECTION_MATRIX, GL_MODELVIEW_MATRIX, GL_VIEWPORT
+
+# Level 0 is full detail. An object drops a level once its on-screen size (pixels across)
+# falls below the level's threshold; the last level is a billboard/impostor.
+PLANE_LOD_PIXELS = (64, 16)
+TREE_LOD_PIXELS = (32, 12)
+CLOUD_LOD_PIXELS = (160, 60)
+LOD_HYSTERESIS = 0.15  # Size must clear a threshold by this fraction before the level changes
+
+PLANE_RADIUS = 3.0  # Bounding radii used for the screen-size estimate
+TREE_RADIUS = 2.5
+CLOUD_RADIUS = 1.5  # Times the cloud's size
+
+class View:
+    """Eye position, screen axes and pixel scale of the current camera, read back from GL."""
+
+    def __init__(self, projection, modelview, viewport_height):
+        rotation, translation = modelview[:3, :3], modelview[:3, 3]
+        self.eye = -rotation.T @ translation
+        self.right = rotation[0]  # Camera x and y axes in world space, for billboards
+        self.up = rotation[1]
+        self.pixel_scale = viewport_height * projection[1, 1] / 2
+
+    @classmethod
+    def from_gl(cls):
+        # Matrices come back column-major, hence the transposes
+        projection = np.asarray(glGetFloatv(GL_PROJECTION_MATRIX), dtype=np.float64).reshape(4, 4).T
+        modelview = np.asarray(glGetFloatv(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(4, 4).T
+        return cls(projection, modelview, glGetIntegerv(GL_VIEWPORT)[3])
+
+    def screen_size(self, radius, distance):
+        # Approximate pixels across for a sphere; distance rather than depth, so turning the camera doesn't change it
+        return 2 * radius * self.pixel_scale / max(distance, radius, 1e-6)
+
+    def distance(self, x, y, z):
+        return math.dist(self.eye, (x, y, z))
+
+    def box_distance(self, lo, hi):
+        # Distance from the eye to the nearest point of a box
+        return math.dist(self.eye, [min(max(e, a), b) for e, a, b in zip(self.eye, lo, hi)])
+
+class LodSelector:
+    """Picks a level per object from its screen size, remembering the last level
+    so objects sitting right at a threshold don't flicker between two."""
+
+    def __init__(self, thresholds, hysteresis=LOD_HYSTERESIS):
+        self.thresholds = thresholds  # Descending pixel sizes, one per level boundary
+        self.hysteresis = hysteresis
+        self.levels = {}  # key -> current level
+
+    @property
+    def coarsest(self):
+        return len(self.thresholds)
+
+    def raw_level(self, size):
+        for level, threshold in enumerate(self.thresholds):
+            if size >= threshold:
+                return level
+        return self.coarsest
+
+    def select(self, key, size):
+        level = self.levels.get(key)
+        if level is None:
+            level = self.raw_level(size)
+        else:
+            while level > 0 and size > self.thresholds[level - 1] * (1 + self.hysteresis):
+                level -= 1
+            while level < self.coarsest and size < self.thresholds[level] * (1 - self.hysteresis):
+                level += 1
+        self.levels[key] = level
+        return level
+
+    def retain(self, keys):
+        # Forget objects that are gone
+        keys = set(keys)
+        self.levels = {k: v for k, v in self.levels.items() if k in keys}
+
+    def clear(self):
+        self.levels.clear()
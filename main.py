@@ -6,19 +6,29 @@ import sys
 import math
 import random
 import socket
+import select
 import threading
-import json
 import time
 import queue
 
 # My modules
 from plane import Plane
+from flight_model import BASE_TICK_RATE
 from environment import Environment
-from skybox import Skybox
+from skybox import Skybox, load_faces
 from camera import Camera
 from instruments import Instruments
-from utils import draw_text, draw_throttle, draw_compass, draw_health_bar, draw_hud_box, draw_rounded_box, draw_icon, draw_cube
+from utils import draw_text, draw_throttle, draw_compass, draw_health_bar, draw_hud_box, draw_rounded_box, draw_icon, draw_cube, draw_tracers
 import sound
+import fonts
+import assets
+import meshes
+import protocol
+import interpolation
+from bullets import RemoteBulletPool
+from frustum import CullStats
+from lod import LodSelector, PLANE_LOD_PIXELS, PLANE_RADIUS
+from hud import HudLayer
 
 PLANE_OPTIONS = [
     {
@@ -49,12 +59,19 @@ network_running = False
 chat_messages = []
 chat_input = ""
 chat_active = False
-remote_bullets = []
+remote_bullets = RemoteBulletPool()
 network_status = "Disconnected" # Can be: Disconnected, Connecting, Connected, Error
 scoreboard_active = False
 game_events = [] # A list of event messages
 event_feed_timers = {} # Tracks fade-out time for each message
 outgoing_messages = queue.Queue() # Thread-safe queue for sending messages
+NETWORK_SEND_RATE = 20 # Hz; remote planes are interpolated, so this doesn't need to match the frame rate
+SIM_TICK_RATE = 60 # Hz; physics always steps at this rate, whatever the frame rate
+SIM_DT = 1.0 / SIM_TICK_RATE
+RENDER_FPS_CAP = 0 # 0 = uncapped; the simulation no longer depends on it
+MAX_FRAME_TIME = 0.25 # Clamp long frames (window drag, breakpoints) so physics doesn't spiral
+PLANE_CULL_RADIUS = 6.0 # Bounding sphere of a plane model for frustum culling
+PRELOAD_FONT_SIZES = (16, 18, 20, 22, 24, 26, 28, 32, 36, 42) # Every size the HUD and menus use
 
 settings = {
     'callsign': '',
@@ -66,6 +83,7 @@ settings_active = True
 settings_error = ''
 pause_focus = 0 # 0: Resume, 1: Restart, 2: Main Menu
 server_ip = ''
+world_seed = None # Set from the server's welcome; every client then generates the same world
 
 # Game States
 GAME_STATE_SETTINGS = 0
@@ -199,8 +217,57 @@ def draw_minimap(player, other_players, display):
     
     glDisable(GL_BLEND)
 
+def handle_network_message(msg, player, player_id, timestamp=None):
+    global other_players, remote_bullets, chat_messages
+    if msg['type'] == 'state':
+        p_id = msg['player_id']
+        if p_id == player_id:
+            # Update local player state from own state message, but do NOT increment deaths
+            player.score = msg.get('score', player.score)
+            player.deaths = msg.get('deaths', player.deaths)
+        else:
+            if p_id not in other_players:
+                other_players[p_id] = Plane(0,0,0, plane_id=p_id)
+            p = other_players[p_id]
+            # Pose goes through the interpolation buffer; it's applied once per frame before drawing
+            p.network_update(msg, timestamp if timestamp is not None else interpolation.now())
+            p.health = msg.get('health', p.health)
+            p.color = msg.get('color', p.color)
+            p.name = msg.get('name', p.name)
+            p.score = msg.get('score', 0)
+            p.deaths = msg.get('deaths', 0)
+    elif msg['type'] == 'join' and msg['player_id'] != player_id:
+        # Binary protocol: name and color are only sent once, on join
+        p_id = msg['player_id']
+        if p_id not in other_players:
+            other_players[p_id] = Plane(0,0,0, plane_id=p_id)
+        other_players[p_id].name = msg['name']
+        other_players[p_id].color = tuple(msg['color'])
+    elif msg['type'] == 'leave':
+        other_players.pop(msg['player_id'], None)
+    elif msg['type'] == 'bullet' and msg['player_id'] != player_id:
+        remote_bullets.spawn(msg['x'], msg['y'], msg['z'], msg['yaw'], msg['pitch'], msg['player_id'])
+    elif msg['type'] == 'chat':
+        chat_messages.append((msg['name'], msg['text']))
+        if len(chat_messages) > 8: chat_messages.pop(0)
+    elif msg['type'] == 'hit':
+        target_id = msg['target_id']
+        attacker_id = msg.get('attacker_id', None)
+        if target_id == player_id:
+            player.health -= msg['damage']
+            add_game_event(f"You were hit by {msg.get('attacker_name', 'Unknown')}")
+        if attacker_id == player_id and msg.get('is_kill'):
+            player.score += 1
+
+def snapshot_time(clock, seq, tick_rate):
+    # Stamp snapshots with server time (seq / tick rate) mapped onto our clock, not arrival time,
+    # so packets that arrive bunched up still interpolate evenly
+    if not tick_rate:
+        return interpolation.now()
+    return clock.local_time(seq / tick_rate)
+
 def network_loop(player, player_name, player_id, server_ip):
-    global other_players, network_running, remote_bullets, chat_messages, network_status, outgoing_messages, score
+    global network_running, network_status, outgoing_messages, score, world_seed
     network_status = "Connecting..."
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
@@ -213,37 +280,55 @@ def network_loop(player, player_name, player_id, server_ip):
         return
     
     network_running = True
-    
-    # Add a welcome message
-    outgoing_messages.put(json.dumps({'type': 'chat', 'name': 'System', 'text': f'{player_name} has joined the lobby.'}))
 
-    buffer = ""
+    # Offer the binary protocol; we keep speaking JSON until the server accepts it
+    protocol_version = 0
+    s.setblocking(True)
+    s.sendall(protocol.encode(protocol.hello_message(player_id, player_name, player.color)))
+    s.setblocking(False)
+
+    # Add a welcome message
+    outgoing_messages.put({'type': 'chat', 'name': 'System', 'text': f'{player_name} has joined the lobby.'})
+
+    decoder = protocol.StreamDecoder()
+    snapshot_history = protocol.SnapshotHistory()
+    acked_seq = 0
+    server_tick_rate = None
+    snapshot_clock = interpolation.SnapshotClock()
+    next_send = 0.0
     while network_running:
         try:
-            # Send our state and any queued messages first
-            state_msg = {
-                'type': 'state', 'player_id': player_id, 'name': player_name,
-                'x': player.x, 'y': player.y, 'z': player.z,
-                'yaw': player.yaw, 'pitch': player.pitch, 'roll': player.roll,
-                'health': player.health,
-                'color': player.color,
-                'score': score,
-                'deaths': player.deaths
-            }
-            s.sendall(json.dumps(state_msg).encode())
-            while not outgoing_messages.empty():
-                msg_to_send = outgoing_messages.get_nowait()
-                s.sendall(msg_to_send.encode())
-            
-            # Now, try to receive data
-            data = s.recv(4096).decode()
-            if not data:
-                network_running = False
-                break
-            buffer += data
-            
+            # Our state and queued messages go out at NETWORK_SEND_RATE...
+            if time.monotonic() >= next_send:
+                next_send = time.monotonic() + 1 / NETWORK_SEND_RATE
+                state_msg = {
+                    'type': 'state', 'player_id': player_id, 'name': player_name,
+                    'x': player.x, 'y': player.y, 'z': player.z,
+                    'yaw': player.yaw, 'pitch': player.pitch, 'roll': player.roll,
+                    'health': player.health,
+                    'color': player.color,
+                    'score': score,
+                    'deaths': player.deaths
+                }
+                s.sendall(protocol.encode(state_msg, protocol_version))
+                while not outgoing_messages.empty():
+                    msg_to_send = outgoing_messages.get_nowait()
+                    s.sendall(protocol.encode(msg_to_send, protocol_version))
+                if snapshot_history.latest_seq != acked_seq:
+                    acked_seq = snapshot_history.latest_seq
+                    s.sendall(protocol.encode({'type': 'ack', 'seq': acked_seq}, protocol_version))
+
+            # ...while incoming data is read as soon as it arrives, all of it
+            readable, _, _ = select.select([s], [], [], max(0.0, next_send - time.monotonic()))
+            while readable:
+                data = s.recv(65536)
+                if not data:
+                    network_running = False
+                    break
+                decoder.feed(data)
+
         except BlockingIOError:
-            # This is expected when no data is available.
+            # Everything available has been read
             pass
         except Exception as e:
             print(f"Network error: {e}")
@@ -251,52 +336,25 @@ def network_loop(player, player_name, player_id, server_ip):
             break
 
         # Process everything in the buffer
-        while True: 
-            if not buffer:
-                break
-            try:
-                msg, end_index = json.JSONDecoder().raw_decode(buffer)
-                
-                if msg['type'] == 'state':
-                    p_id = msg['player_id']
-                    if p_id == player_id:
-                        # Update local player state from own state message, but do NOT increment deaths
-                        player.score = msg.get('score', player.score)
-                        player.deaths = msg.get('deaths', player.deaths)
-                    else:
-                        if p_id not in other_players:
-                            other_players[p_id] = Plane(0,0,0, plane_id=p_id)
-                        p = other_players[p_id]
-                        p.x = msg.get('x', p.x)
-                        p.y = msg.get('y', p.y)
-                        p.z = msg.get('z', p.z)
-                        p.pitch = msg.get('pitch', p.pitch)
-                        p.roll = msg.get('roll', p.roll)
-                        p.yaw = msg.get('yaw', p.yaw)
-                        p.health = msg.get('health', p.health)
-                        p.color = msg.get('color', p.color)
-                        p.name = msg.get('name', p.name)
-                        p.score = msg.get('score', 0)
-                        p.deaths = msg.get('deaths', 0)
-                elif msg['type'] == 'bullet' and msg['player_id'] != player_id:
-                    remote_bullets.append(msg)
-                elif msg['type'] == 'chat':
-                    chat_messages.append((msg['name'], msg['text']))
-                    if len(chat_messages) > 8: chat_messages.pop(0)
-                elif msg['type'] == 'hit':
-                    target_id = msg['target_id']
-                    attacker_id = msg.get('attacker_id', None)
-                    if target_id == player_id:
-                        player.health -= msg['damage']
-                        add_game_event(f"You were hit by {msg.get('attacker_name', 'Unknown')}")
-                    if attacker_id == player_id and msg.get('is_kill'):
-                        player.score += 1
-
-                buffer = buffer[end_index:].lstrip()
-            except json.JSONDecodeError:
-                break # Incomplete message in buffer
-        
-        time.sleep(1/60) # Limit loop to ~60Hz
+        for msg in decoder.messages():
+            if msg.get('type') == 'welcome':
+                protocol_version = msg.get('protocol', 0)
+                server_tick_rate = msg.get('tick_rate')
+                world_seed = msg.get('world_seed', world_seed)
+            elif msg.get('type') == 'delta_snapshot':
+                # Resolve against the acked baseline; dropped if we no longer have it
+                snapshot = snapshot_history.apply(msg)
+                if snapshot:
+                    timestamp = snapshot_time(snapshot_clock, snapshot['seq'], server_tick_rate)
+                    for sub_msg in snapshot['messages']:
+                        handle_network_message(sub_msg, player, player_id, timestamp)
+            elif msg.get('type') == 'snapshot':
+                # One aggregated frame per server tick: every player's state plus events
+                timestamp = snapshot_time(snapshot_clock, msg['seq'], server_tick_rate)
+                for sub_msg in msg['messages']:
+                    handle_network_message(sub_msg, player, player_id, timestamp)
+            else:
+                handle_network_message(msg, player, player_id)
 
     network_status = "Disconnected"
     s.close()
@@ -394,10 +452,65 @@ def draw_fuel_gauge(x, y, w, h, fuel_level):
     draw_text(x + w / 2 - 20, y + h - 15, "FUEL", font_size=18)
     glDisable(GL_BLEND)
 
+def build_hud(display, player, camera, clock, cull_stats):
+    # Retained widgets of the flight HUD; each value is rounded to what its widget can show
+    hud = HudLayer(*display)
+
+    def draw_pilot(value):
+        health, name = value
+        draw_rounded_box(20, display[1] - 90, 200, 85)
+        draw_health_bar(30, display[1] - 75, 180, 20, health)
+        draw_text(30, display[1] - 30, f"Health: {health}", font_size=22)
+        shown_name = name[:14] + ("..." if len(name) > 14 else "")
+        draw_text(30, display[1] - 45, f"Pilot: {shown_name}", font_size=16)
+    hud.add('pilot', (20, display[1] - 90, 200, 85), lambda: (player.health, player_name), draw_pilot)
+
+    hud.add('score', (display[0]//2 - 40, display[1] - 65, 240, 40), lambda: (score,),
+            lambda value: draw_text(display[0]//2 - 30, display[1] - 55, f"Score: {value[0]}", font_size=28))
+
+    def draw_throttle_box(value):
+        draw_rounded_box(display[0] - 110, 40, 80, 240)
+        draw_throttle(display[0] - 95, 55, 30, 200, value[0])
+    hud.add('throttle', (display[0] - 110, 40, 80, 240), lambda: (player.thrust_level,), draw_throttle_box,
+            tolerance=0.005)  # One pixel of the bar
+
+    def draw_stats(value):
+        plane_idx, altitude, airspeed, distance = value
+        draw_rounded_box(20, 20, 270, 120)
+        draw_text(30, 120, f"Plane: {PLANE_OPTIONS[plane_idx]['name']}", font_size=20)
+        draw_text(30, 100, f"Speed: {player.max_speed_knots} kts  Alt: {player.max_altitude_ft} ft  Firepower: {player.firepower}", font_size=16)
+        draw_text(30, 80, f"Altitude: {altitude} ft", font_size=16)
+        draw_text(30, 60, f"Airspeed: {airspeed} kts", font_size=16)
+        draw_text(30, 40, f"Distance from origin: {distance} m", font_size=16)
+    hud.add('stats', (20, 20, 270, 120), lambda: (
+        selected_plane_idx,
+        round(player.y * 3.28084),
+        round(player.velocity * 120),
+        round((player.x ** 2 + player.y ** 2 + player.z ** 2) ** 0.5),
+    ), draw_stats)
+
+    hud.add('fuel', (300, 20, 150, 40), lambda: (round(player.fuel),),
+            lambda value: draw_fuel_gauge(300, 20, 150, 40, value[0]))
+
+    def draw_view(value):
+        mode, fps, visible, culled = value
+        draw_rounded_box(display[0] - 220, 290, 200, 74)
+        draw_text(display[0] - 210, 340, f"View: {mode.title()}", font_size=16)
+        draw_text(display[0] - 210, 320, f"FPS: {fps}", font_size=16)
+        draw_text(display[0] - 210, 300, f"Visible: {visible}  Culled: {culled}", font_size=16)
+    hud.add('view', (display[0] - 220, 290, 200, 74),
+            lambda: (camera.get_mode(), int(clock.get_fps()), cull_stats.visible, cull_stats.culled), draw_view,
+            tolerance=2)
+    return hud
+
+def start_ambient_sounds():
+    sound.play_engine(volume=0.3)
+    sound.play_wind(volume=0.0)
+
 def main():
     global selected_plane_idx, plane_selected, player_name, player_id, lobby_entered, other_players, network_thread, network_running, chat_messages, chat_input, chat_active, remote_bullets, settings, settings_focus, settings_active, settings_error, server_ip, pause_focus, network_status, scoreboard_active, game_state, outgoing_messages, score
     pygame.init()
-    sound.load_sounds()
+    sound.init_mixer()
 
     display = (1200, 800)
     pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
@@ -410,23 +523,32 @@ def main():
     glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
     glLightfv(GL_LIGHT0, GL_POSITION, [0, 5, 5, 1])
 
+    # Files are decoded in the background while the settings screen runs. Start waits for
+    # the skybox; the game runs without sound until it arrives. Font atlases are only warmed
+    # up here (any missing size is built when first drawn), so nothing waits on them.
+    loader = assets.AssetManager()
+    skybox = loader.load('skybox', load_faces, Skybox.staged, critical=True)
+    loader.load('sounds', sound.load_sound_files).then(lambda _: start_ambient_sounds())
+    loader.load('fonts', lambda: PRELOAD_FONT_SIZES, fonts.build_atlases)
+
     player = Plane(0, 0.6, 0, plane_id=0)
     score = 0
     
     game_state = GAME_STATE_SETTINGS # Start in settings
     
     game_environment = Environment()
-    skybox = Skybox()
+    player.terrain = game_environment
     camera = Camera(player)
+    cull_stats = CullStats()
+    plane_lod = LodSelector(PLANE_LOD_PIXELS)
     instruments = Instruments(display[0]/2 - (75 * 1.5 + 5), 10, 75)
 
-    game_environment.runways.append(([0, 0.1, 0], [10, 200], 0))
-    game_environment.generate_scenery([0,0,0], mountain_count=20, tree_count=100)
+    # The spawn runway is part of world chunk (0, 0)
+    game_environment.load_around([0, 0, 0])
     
-    sound.play_engine(volume=0.3)
-    sound.play_wind(volume=0.0)
-
     clock = pygame.time.Clock()
+    accumulator = 0.0
+    hud = build_hud(display, player, camera, clock, cull_stats)
     running = True
 
     while running:
@@ -437,6 +559,9 @@ def main():
                 network_running = False
                 running = False
 
+        # Finished background loads: GL uploads, within this frame's budget
+        loader.update()
+
         # --- State-based Logic ---
         if game_state == GAME_STATE_SETTINGS:
             # Settings Screen Logic
@@ -456,6 +581,8 @@ def main():
                                 settings_error = 'Enter a callsign.'
                             elif not settings['server_ip']:
                                 settings_error = 'Enter server IP.'
+                            elif not loader.ready():
+                                settings_error = 'Still loading...'
                             else:
                                 player_name = settings['callsign']
                                 selected_plane_idx = settings['plane_idx']
@@ -511,6 +638,7 @@ def main():
                                 network_thread.join()
                             network_thread = None
                             other_players = {}
+                            remote_bullets.clear()
                             game_state = GAME_STATE_SETTINGS
                             lobby_entered = False
                             player.reset()
@@ -529,8 +657,7 @@ def main():
                                     chat_messages.pop(0)
 
                                 # Queue chat message to be sent by network thread
-                                msg = json.dumps({'type': 'chat', 'name': player_name, 'text': chat_input})
-                                outgoing_messages.put(msg)
+                                outgoing_messages.put({'type': 'chat', 'name': player_name, 'text': chat_input})
                                 chat_input = ""
                             chat_active = False # Deactivate chat on send or empty send
                         elif event.key == pygame.K_ESCAPE:
@@ -553,25 +680,46 @@ def main():
                             camera.cycle_mode()
                         elif event.key == pygame.K_TAB:
                             scoreboard_active = not scoreboard_active
+                        elif event.key == pygame.K_F3:
+                            # Toggle retained (VBO) vs immediate-mode rendering for comparison
+                            meshes.USE_VBO = not meshes.USE_VBO
 
-        # --- Continuous Key Presses (outside event loop) ---
-        if game_state == GAME_STATE_PLAYING and not chat_active:
-            keys = pygame.key.get_pressed()
-            player.handle_input(keys)
-        
         # --- Game Logic Update ---
+        frame_dt = min(clock.get_time() / 1000.0, MAX_FRAME_TIME)
+        if world_seed is not None and world_seed != game_environment.world.seed:
+            game_environment.set_world_seed(world_seed, [player.x, player.y, player.z])
         game_environment.update([player.x, player.y, player.z])
-        if game_state == GAME_STATE_PLAYING:
+
+        # Remote planes are shown slightly in the past, interpolated between network snapshots
+        remote_time = interpolation.render_time()
+        for p_obj in list(other_players.values()):
+            p_obj.apply_network_state(remote_time)
+
+        # Fixed-timestep simulation: run as many ticks as real time demands, then draw
+        # the player blended between the last two ticks
+        keys = pygame.key.get_pressed()
+        if game_state != GAME_STATE_PLAYING:
+            # Paused or in settings: no ticks run, so hold the pose still and bank no time
+            remote_bullets.step(frame_dt * BASE_TICK_RATE)
+            player.snap_render_state()
+        else:
+            accumulator += frame_dt
+        while game_state == GAME_STATE_PLAYING and accumulator >= SIM_DT:
+            accumulator -= SIM_DT
+            remote_bullets.step(SIM_DT * BASE_TICK_RATE)
+            player.save_render_state()
+            if not chat_active:
+                player.handle_input(keys, SIM_DT)
             if player.health <= 0:
-                player.update_destroyed() # This will handle the explosion and timers
+                player.update_destroyed(SIM_DT) # This will handle the explosion and timers
                 if player.respawn_timer <= 0:
                     player.respawn()
                     add_game_event("You have respawned.")
             else:
-                hit_events = player.update(list(other_players.values()))
+                hit_events = player.update(list(other_players.values()), SIM_DT)
                 for event in hit_events:
                     event['attacker_name'] = player_name
-                    outgoing_messages.put(json.dumps(event))
+                    outgoing_messages.put(event)
 
                     # Process locally for immediate feedback
                     target_id = event['target_id']
@@ -582,7 +730,10 @@ def main():
                     if event.get('is_kill'):
                         score += 1
                         add_game_event(f"You shot down {event['victim_name']}")
-            
+        if game_state == GAME_STATE_PLAYING:
+            player.interpolate_render_state(accumulator / SIM_DT)
+
+        if game_state == GAME_STATE_PLAYING:
             # --- Sound Updates ---
             # Engine Volume
             base_volume = 0.2
@@ -614,10 +765,15 @@ def main():
         glLoadIdentity()
         
         camera.apply()
+        frustum = camera.frustum()
+        view = camera.view()
+        cull_stats.reset()
 
         glEnable(GL_DEPTH_TEST)
-        skybox.draw([player.x, player.y, player.z])
-        game_environment.draw([player.x, player.y, player.z])
+        render_pos = [player.render_x, player.render_y, player.render_z]
+        if skybox.ready:
+            skybox.value.draw(render_pos)
+        game_environment.draw(render_pos, frustum, cull_stats, view)
 
         if camera.get_mode() != 'cockpit':
             player.draw()
@@ -625,7 +781,10 @@ def main():
         # Draw other players
         for p_obj in other_players.values():
             if p_obj.health > 0:
-                p_obj.draw()
+                if not cull_stats.count(frustum.sphere_visible(p_obj.render_x, p_obj.render_y, p_obj.render_z, PLANE_CULL_RADIUS)):
+                    continue
+                distance = view.distance(p_obj.render_x, p_obj.render_y, p_obj.render_z)
+                p_obj.draw(plane_lod.select(p_obj.player_id, view.screen_size(PLANE_RADIUS, distance)), view)
 
                 # Health bar above other players
                 glPushMatrix()
@@ -634,21 +793,11 @@ def main():
                 glPopMatrix()
 
         # Multiplayer bullet firing
-        if player.bullets:
-            for bullet in player.bullets:
-                if bullet.get('just_fired', True):
-                    bullet['just_fired'] = False
-                    msg = json.dumps({'type': 'bullet', 'player_id': player_id, 'x': bullet['x'], 'y': bullet['y'], 'z': bullet['z'], 'yaw': bullet['yaw'], 'pitch': bullet['pitch']})
-                    outgoing_messages.put(msg)
+        for bullet in player.bullets.drain_fired():
+            outgoing_messages.put({'type': 'bullet', 'player_id': player_id, 'x': bullet['x'], 'y': bullet['y'], 'z': bullet['z'], 'yaw': bullet['yaw'], 'pitch': bullet['pitch']})
         
         # Render remote bullets
-        for b in remote_bullets:
-            glPushMatrix()
-            glColor3f(1.0, 0.8, 0.2)
-            glTranslatef(b['x'] - player.x, b['y'] - player.y, b['z'] - player.z)
-            glScalef(0.12, 0.12, 1.0)
-            draw_cube()
-            glPopMatrix()
+        draw_tracers(*remote_bullets.live())
 
         # --- 2D Drawing (HUD) ---
         glMatrixMode(GL_PROJECTION)
@@ -658,38 +807,14 @@ def main():
         glLoadIdentity()
         glDisable(GL_DEPTH_TEST)
         
-        # Health bar (top left)
-        draw_rounded_box(20, display[1] - 90, 200, 85)
-        draw_health_bar(30, display[1] - 75, 180, 20, player.health)
-        draw_text(30, display[1] - 30, f"Health: {player.health}", font_size=22)
-        shown_name = player_name[:14] + ("..." if len(player_name) > 14 else "")
-        draw_text(30, display[1] - 45, f"Pilot: {shown_name}", font_size=16)
-        # Score (top center)
-        draw_text(display[0]//2 - 30, display[1] - 55, f"Score: {score}", font_size=28)
+        # Health, score, throttle, plane stats, fuel and view box: retained, redrawn only on change
+        hud.update()
+        hud.draw()
         
         # Minimap (bottom right) and Chat (bottom left)
         draw_minimap(player, other_players, display)
         draw_chat_ui(display, chat_messages, chat_input, chat_active)
 
-        # Throttle (bottom right)
-        draw_rounded_box(display[0] - 110, 40, 80, 240)
-        draw_throttle(display[0] - 95, 55, 30, 200, player.thrust_level)
-        # Plane stats (bottom left)
-        draw_rounded_box(20, 20, 270, 120)
-        draw_text(30, 120, f"Plane: {PLANE_OPTIONS[selected_plane_idx]['name']}", font_size=20)
-        draw_text(30, 100, f"Speed: {player.max_speed_knots} kts  Alt: {player.max_altitude_ft} ft  Firepower: {player.firepower}", font_size=16)
-        altitude = player.y * 3.28084
-        airspeed = player.velocity * 120
-        draw_text(30, 80, f"Altitude: {altitude:.2f} ft", font_size=16)
-        draw_text(30, 60, f"Airspeed: {airspeed:.2f} kts", font_size=16)
-        # Distance indicator (from origin)
-        distance = ((player.x ** 2 + player.y ** 2 + player.z ** 2) ** 0.5)
-        draw_text(30, 40, f"Distance from origin: {distance:.1f} m", font_size=16)
-        # Vibe message (bottom center)
-        
-        # Fuel Gauge (next to plane stats)
-        draw_fuel_gauge(300, 20, 150, 40, player.fuel)
-
         # Low Fuel Warning
         if player.fuel < 20:
             pulse = abs(math.sin(pygame.time.get_ticks() * 0.005))
@@ -697,13 +822,6 @@ def main():
             draw_rounded_box(display[0]//2 - 100, 150, 200, 40, color=warn_color)
             draw_text(display[0]//2 - 50, 162, "LOW FUEL", font_size=24)
 
-        # Camera mode and FPS (bottom right, above throttle)
-        draw_rounded_box(display[0] - 220, 300, 200, 54)
-        camera_mode_text = f"View: {camera.get_mode().title()}"
-        draw_text(display[0] - 210, 340, camera_mode_text, font_size=16)
-        fps = clock.get_fps()
-        fps_text = f"FPS: {int(fps)}"
-        draw_text(display[0] - 210, 320, fps_text, font_size=16)
         # Show ground movement instructions when on ground (center bottom)
         
         if game_state == GAME_STATE_PAUSED:
@@ -723,6 +841,11 @@ def main():
             box_x, box_y = display[0]//2 - box_w//2, display[1]//2 - box_h//2
             draw_rounded_box(box_x, box_y, box_w, box_h, color=(0.12,0.12,0.12,0.95))
             draw_text(box_x+30, box_y+box_h-60, 'Multiplayer Flight Simulator', font_size=36)
+            # Asset loading progress
+            progress = loader.progress()
+            if progress < 1.0:
+                draw_rounded_box(box_x+30, box_y+box_h-80, box_w-60, 6, radius=3, color=(0.2,0.2,0.2,0.8))
+                draw_rounded_box(box_x+30, box_y+box_h-80, max(6, (box_w-60) * progress), 6, radius=3, color=(0.3,0.7,0.3,0.9))
             # Callsign
             draw_text(box_x+30, box_y+box_h-110, 'Callsign:', font_size=22)
             draw_rounded_box(box_x+160, box_y+box_h-120, 220, 36, color=(0.2,0.2,0.2,0.8))
@@ -758,7 +881,7 @@ def main():
 
         # Update event feed timers
         for event_id, timer in list(event_feed_timers.items()):
-            new_timer = timer - (1/60.0)
+            new_timer = timer - frame_dt
             if new_timer <= 0:
                 del event_feed_timers[event_id]
             else:
@@ -768,11 +891,12 @@ def main():
         draw_event_feed(display)
 
         pygame.display.flip()
-        clock.tick(60)
+        clock.tick(RENDER_FPS_CAP)
 
     # --- Shutdown ---
     if network_thread:
         network_thread.join()
+    loader.shutdown()
     pygame.quit()
     sys.exit()
 
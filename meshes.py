@@ -0,0 +1,126 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+import math
+
+# Set to False to render everything through the old glBegin/glEnd path (for comparison)
+USE_VBO = True
+
+# Interleaved layout: position (3 floats) + normal (3 floats)
+VERTEX_STRIDE = 6 * 4
+
+_meshes = {}
+
+class Mesh:
+    def __init__(self, vertices, mode=GL_TRIANGLES):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.count = len(self.vertices)
+        self.mode = mode
+        self.vbo = None
+
+    def upload(self):
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        if self.vbo is None:
+            self.upload()
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        glDrawArrays(self.mode, 0, self.count)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+
+def quads_to_triangles(quads):
+    # (N, 4, 6) quad corners -> (N * 6, 6) triangle list
+    quads = np.asarray(quads, dtype=np.float32).reshape(-1, 4, 6)
+    return quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 6)
+
+def build_cube():
+    faces = [
+        # normal, corners (same winding as the immediate-mode cube)
+        ((0, 0, 1), [(-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5)]),
+        ((0, 0, -1), [(-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5)]),
+        ((0, 1, 0), [(-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5)]),
+        ((0, -1, 0), [(-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (-0.5, -0.5, 0.5)]),
+        ((1, 0, 0), [(0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (0.5, 0.5, 0.5), (0.5, -0.5, 0.5)]),
+        ((-1, 0, 0), [(-0.5, -0.5, -0.5), (-0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (-0.5, 0.5, -0.5)]),
+    ]
+    quads = [[corner + normal for corner in corners] for normal, corners in faces]
+    return quads_to_triangles(quads)
+
+def build_cylinder(radius, length, slices):
+    theta = 2.0 * np.pi * np.arange(slices + 1) / slices
+    x = radius * np.cos(theta)
+    y = radius * np.sin(theta)
+    nx, ny = np.cos(theta), np.sin(theta)
+    half = length / 2
+    # Side wall: one quad per slice
+    quads = np.zeros((slices, 4, 6), dtype=np.float32)
+    for k, (i, z) in enumerate([(0, -half), (0, half), (1, half), (1, -half)]):
+        quads[:, k, 0] = x[i:slices + i]
+        quads[:, k, 1] = y[i:slices + i]
+        quads[:, k, 2] = z
+        quads[:, k, 3] = nx[i:slices + i]
+        quads[:, k, 4] = ny[i:slices + i]
+    side = quads_to_triangles(quads)
+    # End caps as triangle fans around the centre
+    caps = []
+    for z in [-half, half]:
+        fan = np.zeros((slices, 3, 6), dtype=np.float32)
+        fan[:, 0, 2] = z
+        fan[:, 1, 0], fan[:, 1, 1] = x[:-1], y[:-1]
+        fan[:, 2, 0], fan[:, 2, 1] = x[1:], y[1:]
+        fan[:, 1:, 2] = z
+        fan[:, :, 5] = 1.0 if z > 0 else -1.0
+        caps.append(fan.reshape(-1, 6))
+    return np.concatenate([side] + caps)
+
+def build_sphere(lon_steps=8, lat_steps=4):
+    # Same lat/long patch layout as Environment.draw_sphere; fewer steps for distant LODs
+    quads = []
+    for i in range(lon_steps):
+        for j in range(lat_steps):
+            corners = [(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)]
+            quad = []
+            for a, b in corners:
+                lon, lat = math.radians(a * 360 / lon_steps), math.radians(b * 180 / lat_steps)
+                p = (math.cos(lon) * math.cos(lat), math.sin(lat), math.sin(lon) * math.cos(lat))
+                quad.append(p + p)  # unit sphere: normal == position
+            quads.append(quad)
+    return quads_to_triangles(quads)
+
+def get_mesh(key):
+    mesh = _meshes.get(key)
+    if mesh is None:
+        kind = key[0]
+        if kind == 'cube':
+            mesh = Mesh(build_cube())
+        elif kind == 'cylinder':
+            mesh = Mesh(build_cylinder(*key[1:]))
+        elif kind == 'sphere':
+            mesh = Mesh(build_sphere(*key[1:]))
+        else:
+            raise KeyError(f"Unknown mesh: {key}")
+        _meshes[key] = mesh
+    return mesh
+
+def draw_mesh(key):
+    get_mesh(key).draw()
+
+def clear_cache():
+    # Call when the GL context is recreated so buffers get re-uploaded
+    for mesh in _meshes.values():
+        mesh.release()
+    _meshes.clear()
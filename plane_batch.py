@@ -0,0 +1,152 @@
+import numpy as np
+
+from flight_model import BASE_TICK_RATE
+
+GROUND_LEVEL = 1.7
+
+# PlaneModel attributes mirrored as one float array each (x, y, z are columns of pos)
+FLOAT_FIELDS = (
+    'yaw', 'pitch', 'roll', 'velocity', 'thrust_level', 'pitch_rate', 'target_roll_angle',
+    'ground_turn_rate', 'max_thrust', 'drag', 'gravity', 'takeoff_speed', 'fuel',
+    'fuel_consumption', 'damage', 'engine_health', 'health', 'last_y', 'vertical_speed',
+    'propeller_angle', 'wheel_angle', 'sim_time',
+)
+BOOL_FIELDS = ('is_airborne', 'is_stalling')
+
+class PlaneBatch:
+    """Flight state of N planes in NumPy arrays, stepped with the same equations as
+    PlaneModel.update in one call. Bullets and destroyed planes stay with the scalar path:
+    planes with health <= 0 are left untouched. terrain is shared by the whole batch and
+    needs heights_at (an ObstacleIndex or Environment); None is flat ground."""
+
+    def __init__(self, n, terrain=None):
+        self.terrain = terrain
+        self.pos = np.zeros((n, 3))
+        for name in FLOAT_FIELDS:
+            setattr(self, name, np.zeros(n))
+        for name in BOOL_FIELDS:
+            setattr(self, name, np.zeros(n, dtype=bool))
+
+    def __len__(self):
+        return len(self.pos)
+
+    @classmethod
+    def from_planes(cls, planes, terrain=None):
+        batch = cls(len(planes), terrain)
+        batch.pos[:] = [(p.x, p.y, p.z) for p in planes]
+        for name in FLOAT_FIELDS + BOOL_FIELDS:
+            getattr(batch, name)[:] = [getattr(p, name, 0.0) for p in planes]
+        return batch
+
+    def write_back(self, planes):
+        for i, p in enumerate(planes):
+            p.x, p.y, p.z = (float(v) for v in self.pos[i])
+            for name in FLOAT_FIELDS:
+                setattr(p, name, float(getattr(self, name)[i]))
+            for name in BOOL_FIELDS:
+                setattr(p, name, bool(getattr(self, name)[i]))
+
+    def step(self, dt=1.0 / BASE_TICK_RATE):
+        # Returns indices of planes that took off and that started stalling this tick (for sounds)
+        alive = self.health > 0
+        # With everyone alive (the usual case) work on views instead of gathered copies
+        idx = slice(None) if alive.all() else np.flatnonzero(alive)
+        k = dt * BASE_TICK_RATE
+        x, y, z = self.pos[idx, 0], self.pos[idx, 1], self.pos[idx, 2]
+        yaw, pitch, roll = self.yaw[idx], self.pitch[idx], self.roll[idx]
+        velocity, thrust = self.velocity[idx], self.thrust_level[idx]
+        airborne = self.is_airborne[idx]
+        health = self.health[idx]
+
+        # Orientation
+        pitch += self.pitch_rate[idx] * k
+        roll += (self.target_roll_angle[idx] - roll) * (1.0 - 0.95 ** k)
+        yaw += np.where(airborne,
+                        np.sin(np.radians(roll)) * np.maximum(velocity, 0.3) * 1.0 * k,
+                        self.ground_turn_rate[idx] * 1.5 * velocity * k)
+        np.clip(roll, -65.0, 65.0, out=roll)
+        np.clip(pitch, -55.0, 55.0, out=pitch)
+
+        # Velocity
+        thrust_force = thrust * self.max_thrust[idx]
+        drag_force = self.drag[idx] * velocity * velocity
+        drag_force = np.where(airborne, drag_force, drag_force + 0.01 * velocity)
+        velocity += (thrust_force - drag_force) * k
+        np.maximum(velocity, 0.0, out=velocity)
+
+        # Position along the forward vector
+        yaw_rad = np.radians(yaw)
+        pitch_rad = np.radians(pitch)
+        x += velocity * (np.sin(yaw_rad) * np.cos(pitch_rad)) * k
+        y += velocity * np.sin(pitch_rad) * k
+        z += velocity * (-np.cos(yaw_rad) * np.cos(pitch_rad)) * k
+
+        # Lift, takeoff and gravity
+        lift = velocity * velocity * 0.002
+        lift = np.where(pitch > 0, lift * (1 + pitch / 20), lift)
+        took_off = ~airborne & (velocity > self.takeoff_speed[idx]) & (pitch > 1)
+        airborne |= took_off
+        y[airborne] += lift[airborne] * k
+        y[airborne] -= self.gravity[idx][airborne] * k
+
+        vertical_speed = (y - self.last_y[idx]) / dt
+        self.last_y[idx] = y
+
+        # Ground collision
+        grounded = y < GROUND_LEVEL
+        y[grounded] = GROUND_LEVEL
+        airborne[grounded] = False
+        roll[grounded] = 0
+        health[grounded & (vertical_speed < -0.8)] -= 60
+
+        # Flying into a mountain or tree destroys the plane
+        if self.terrain is not None:
+            terrain_height = self.terrain.heights_at(x, z)
+            crashed = y < terrain_height
+            y[crashed] = terrain_height[crashed]
+            health[crashed] = 0
+
+        # Fuel
+        fuel = self.fuel[idx]
+        burning = thrust > 0
+        fuel[burning] -= self.fuel_consumption[idx][burning] * thrust[burning] * k
+        empty = burning & (fuel <= 0)
+        fuel[empty] = 0
+        thrust[empty] = 0
+
+        # Damage effects
+        damage = self.damage[idx]
+        max_thrust = self.max_thrust[idx]
+        max_thrust[damage > 50] *= 0.8 ** k
+        engine_health = self.engine_health[idx]
+        critical = damage > 80
+        engine_health[critical] -= 0.1 * k
+        thrust[critical & (engine_health < 20)] *= 0.5 ** k
+
+        # Propeller and wheel animation
+        propeller = self.propeller_angle[idx] + thrust * 100 * k
+        propeller[propeller > 360.0] -= 360.0
+        wheel = self.wheel_angle[idx]
+        rolling = (y <= 0.6) & (velocity > 0)
+        wheel[rolling] += velocity[rolling] * 60 * k
+        wheel[rolling & (wheel > 360.0)] -= 360.0
+
+        # Stall detection
+        stalling = airborne & ((velocity < self.takeoff_speed[idx] * 0.8) | (np.abs(pitch) > 25))
+        stall_started = stalling & ~self.is_stalling[idx]
+
+        self.pos[idx, 0], self.pos[idx, 1], self.pos[idx, 2] = x, y, z
+        self.yaw[idx], self.pitch[idx], self.roll[idx] = yaw, pitch, roll
+        self.velocity[idx] = velocity
+        self.thrust_level[idx] = thrust
+        self.is_airborne[idx] = airborne
+        self.is_stalling[idx] = stalling
+        self.health[idx] = health
+        self.vertical_speed[idx] = vertical_speed
+        self.fuel[idx] = fuel
+        self.max_thrust[idx] = max_thrust
+        self.engine_health[idx] = engine_health
+        self.propeller_angle[idx] = propeller
+        self.wheel_angle[idx] = wheel
+        self.sim_time[idx] += dt
+        return np.flatnonzero(alive)[took_off], np.flatnonzero(alive)[stall_started]
@@ -0,0 +1,401 @@
+import json
+import struct
+
+# Version 0 is the original stream of concatenated JSON objects.
+# Version 1 adds length-prefixed binary frames, negotiated with a JSON hello/welcome.
+# Version 2 adds bit-packed delta snapshots against the client's last acked snapshot.
+PROTOCOL_VERSION = 2
+
+# Every binary frame starts with this byte. 0xF5 can never occur in UTF-8 text,
+# so JSON messages and binary frames can share one stream unambiguously.
+FRAME_MAGIC = 0xF5
+FRAME_HEADER = struct.Struct('!BBH')  # magic, message type, payload length
+MAX_PAYLOAD = 0xFFFF
+
+MSG_STATE = 1
+MSG_BULLET = 2
+MSG_HIT = 3
+MSG_CHAT = 4
+MSG_JOIN = 5
+MSG_SNAPSHOT = 6
+MSG_DELTA_SNAPSHOT = 7
+MSG_ACK = 8
+
+# player_id, x, y, z, yaw, pitch, roll, health, score, deaths
+STATE = struct.Struct('!H6fhHH')
+# player_id, x, y, z, yaw, pitch
+BULLET = struct.Struct('!H5f')
+# target_id, attacker_id, damage, is_kill (+ attacker and victim names)
+HIT = struct.Struct('!HHhB')
+# player_id, r, g, b (+ name)
+JOIN = struct.Struct('!H3f')
+# sequence number, state count (+ state records, then embedded event frames)
+SNAPSHOT = struct.Struct('!IH')
+# sequence number, baseline sequence (0 = none), record count, removed count, bitstream bytes
+# (+ bit-packed records, then embedded event frames)
+DELTA_SNAPSHOT = struct.Struct('!IIHHH')
+# last snapshot sequence number the client has decoded
+ACK = struct.Struct('!I')
+
+# Delta snapshot quantization
+POSITION_SCALE = 64  # 1/64 world unit
+ANGLE_BITS = 16
+STATE_FIELDS = ('x', 'y', 'z', 'yaw', 'pitch', 'roll', 'health', 'score', 'deaths')
+POSITION_FIELDS = 3
+ANGLE_FIELDS = 3
+DELTA_WIDTHS = (7, 13, 20, 32)  # Bit widths selectable by a 2-bit prefix
+SNAPSHOT_HISTORY = 64  # Snapshots kept on both ends for use as delta baselines
+
+def clamp_int(value, low, high):
+    return max(low, min(high, int(round(value))))
+
+def pack_string(text):
+    data = text.encode('utf-8')[:255]
+    return bytes([len(data)]) + data
+
+def unpack_string(payload, offset):
+    length = payload[offset]
+    start = offset + 1
+    return payload[start:start + length].decode('utf-8', errors='ignore'), start + length
+
+def frame(msg_type, payload):
+    return FRAME_HEADER.pack(FRAME_MAGIC, msg_type, len(payload)) + payload
+
+def encode_json(msg):
+    return json.dumps(msg).encode()
+
+def pack_state(msg):
+    return STATE.pack(
+        msg['player_id'], msg['x'], msg['y'], msg['z'],
+        msg['yaw'], msg['pitch'], msg['roll'],
+        clamp_int(msg.get('health', 100), -32768, 32767),
+        clamp_int(msg.get('score', 0), 0, 0xFFFF),
+        clamp_int(msg.get('deaths', 0), 0, 0xFFFF))
+
+def unpack_state(payload, offset=0):
+    player_id, x, y, z, yaw, pitch, roll, health, score, deaths = STATE.unpack_from(payload, offset)
+    return {
+        'type': 'state', 'player_id': player_id,
+        'x': x, 'y': y, 'z': z, 'yaw': yaw, 'pitch': pitch, 'roll': roll,
+        'health': health, 'score': score, 'deaths': deaths
+    }
+
+def quantize_state(msg):
+    # -> tuple of ints in STATE_FIELDS order
+    angle_steps = 1 << ANGLE_BITS
+    return (
+        int(round(msg['x'] * POSITION_SCALE)),
+        int(round(msg['y'] * POSITION_SCALE)),
+        int(round(msg['z'] * POSITION_SCALE)),
+        int(round(msg['yaw'] / 360.0 * angle_steps)) % angle_steps,
+        int(round(msg['pitch'] / 360.0 * angle_steps)) % angle_steps,
+        int(round(msg['roll'] / 360.0 * angle_steps)) % angle_steps,
+        clamp_int(msg.get('health', 100), -32768, 32767),
+        clamp_int(msg.get('score', 0), 0, 0xFFFF),
+        clamp_int(msg.get('deaths', 0), 0, 0xFFFF),
+    )
+
+def dequantize_state(player_id, q):
+    angle_steps = 1 << ANGLE_BITS
+    def signed_angle(step):
+        angle = step * 360.0 / angle_steps
+        return angle - 360.0 if angle >= 180.0 else angle
+    return {
+        'type': 'state', 'player_id': player_id,
+        'x': q[0] / POSITION_SCALE, 'y': q[1] / POSITION_SCALE, 'z': q[2] / POSITION_SCALE,
+        'yaw': q[3] * 360.0 / angle_steps, 'pitch': signed_angle(q[4]), 'roll': signed_angle(q[5]),
+        'health': q[6], 'score': q[7], 'deaths': q[8]
+    }
+
+def zigzag(value):
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+def unzigzag(value):
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+class BitWriter:
+    def __init__(self):
+        self.value = 0
+        self.bits = 0
+
+    def write(self, value, width):
+        self.value |= (value & ((1 << width) - 1)) << self.bits
+        self.bits += width
+
+    def write_delta(self, delta):
+        value = zigzag(delta)
+        for prefix, width in enumerate(DELTA_WIDTHS):
+            if value < (1 << width):
+                break
+        self.write(prefix, 2)
+        self.write(value, width)
+
+    def to_bytes(self):
+        return self.value.to_bytes((self.bits + 7) // 8, 'little')
+
+class BitReader:
+    def __init__(self, data):
+        self.value = int.from_bytes(data, 'little')
+        self.pos = 0
+
+    def read(self, width):
+        value = (self.value >> self.pos) & ((1 << width) - 1)
+        self.pos += width
+        return value
+
+    def read_delta(self):
+        return unzigzag(self.read(DELTA_WIDTHS[self.read(2)]))
+
+def encode_delta_snapshot(seq, baseline_seq, baseline, states, event_frames, held=()):
+    # baseline/states: {player_id: quantized tuple}. Only changed fields are written;
+    # positions as bit-packed deltas, everything else as fixed-width values. Players in held
+    # weren't updated this tick and are left out; every other player gets a record, an empty
+    # one if nothing changed, so the client knows its state is current.
+    bits = BitWriter()
+    count = 0
+    for player_id, q in states.items():
+        base = baseline.get(player_id)
+        mask = 0
+        for i in range(len(STATE_FIELDS)):
+            if base is None or q[i] != base[i]:
+                mask |= 1 << i
+        if not mask and player_id in held:
+            continue
+        count += 1
+        bits.write(player_id, 16)
+        bits.write(mask, len(STATE_FIELDS))
+        for i in range(len(STATE_FIELDS)):
+            if mask & (1 << i):
+                if i < POSITION_FIELDS:
+                    bits.write_delta(q[i] - (base[i] if base is not None else 0))
+                else:
+                    bits.write(q[i], 16)
+    removed = [player_id for player_id in baseline if player_id not in states]
+    for player_id in removed:
+        bits.write(player_id, 16)
+    bitstream = bits.to_bytes()
+    payload = DELTA_SNAPSHOT.pack(seq, baseline_seq, count, len(removed), len(bitstream)) + bitstream
+    overflow = []
+    for event in event_frames:
+        if not overflow and len(payload) + len(event) <= MAX_PAYLOAD:
+            payload += event
+        else:
+            overflow.append(event)
+    return frame(MSG_DELTA_SNAPSHOT, payload) + b''.join(overflow)
+
+def decode_delta_snapshot(payload):
+    # Raw decode; SnapshotHistory resolves the records against the baseline
+    seq, baseline_seq, count, removed_count, length = DELTA_SNAPSHOT.unpack_from(payload)
+    offset = DELTA_SNAPSHOT.size
+    bits = BitReader(payload[offset:offset + length])
+    records = []
+    for _ in range(count):
+        player_id = bits.read(16)
+        mask = bits.read(len(STATE_FIELDS))
+        fields = {}
+        for i in range(len(STATE_FIELDS)):
+            if mask & (1 << i):
+                fields[i] = bits.read_delta() if i < POSITION_FIELDS else bits.read(16)
+        records.append((player_id, fields))
+    removed = [bits.read(16) for _ in range(removed_count)]
+    offset += length
+    events = []
+    while offset + FRAME_HEADER.size <= len(payload):
+        _, msg_type, frame_length = FRAME_HEADER.unpack_from(payload, offset)
+        start = offset + FRAME_HEADER.size
+        msg = decode_frame(msg_type, payload[start:start + frame_length])
+        if msg is not None:
+            events.append(msg)
+        offset = start + frame_length
+    return {'type': 'delta_snapshot', 'seq': seq, 'baseline': baseline_seq,
+            'records': records, 'removed': removed, 'events': events}
+
+class SnapshotHistory:
+    """Client side of delta snapshots: keeps recent decoded snapshots as baselines."""
+
+    def __init__(self):
+        self.snapshots = {}  # seq -> {player_id: quantized tuple}
+        self.latest_seq = 0
+
+    def apply(self, delta):
+        # Returns a plain 'snapshot' message, or None if the baseline is unknown
+        if delta['baseline']:
+            baseline = self.snapshots.get(delta['baseline'])
+            if baseline is None:
+                return None
+        else:
+            baseline = {}
+        states = dict(baseline)
+        for player_id in delta['removed']:
+            states.pop(player_id, None)
+        for player_id, fields in delta['records']:
+            base = baseline.get(player_id)
+            q = list(base) if base is not None else [0] * len(STATE_FIELDS)
+            for i, value in fields.items():
+                if i < POSITION_FIELDS:
+                    q[i] += value
+                elif i == STATE_FIELDS.index('health'):
+                    q[i] = value - 0x10000 if value & 0x8000 else value
+                else:
+                    q[i] = value
+            states[player_id] = tuple(q)
+        seq = delta['seq']
+        self.snapshots[seq] = states
+        self.latest_seq = max(self.latest_seq, seq)
+        for old_seq in [s for s in self.snapshots if s <= self.latest_seq - SNAPSHOT_HISTORY]:
+            del self.snapshots[old_seq]
+        # Players with a record (possibly empty) are current as of this snapshot; the rest
+        # weren't updated this tick and keep whatever the client last saw
+        messages = [dequantize_state(player_id, states[player_id]) for player_id, _ in delta['records']]
+        messages += [{'type': 'leave', 'player_id': player_id} for player_id in delta['removed']]
+        return {'type': 'snapshot', 'seq': seq, 'messages': messages + delta['events']}
+
+def encode_binary(msg):
+    # Returns None for messages that have no binary layout (sent as JSON instead)
+    msg_type = msg.get('type')
+    if msg_type == 'state':
+        return frame(MSG_STATE, pack_state(msg))
+    if msg_type == 'bullet':
+        payload = BULLET.pack(msg['player_id'], msg['x'], msg['y'], msg['z'], msg['yaw'], msg['pitch'])
+        return frame(MSG_BULLET, payload)
+    if msg_type == 'hit':
+        payload = HIT.pack(
+            msg['target_id'], msg.get('attacker_id') or 0,
+            clamp_int(msg['damage'], -32768, 32767), 1 if msg.get('is_kill') else 0)
+        payload += pack_string(msg.get('attacker_name', '')) + pack_string(msg.get('victim_name', ''))
+        return frame(MSG_HIT, payload)
+    if msg_type == 'chat':
+        return frame(MSG_CHAT, pack_string(msg['name']) + pack_string(msg['text']))
+    if msg_type == 'join':
+        payload = JOIN.pack(msg['player_id'], *msg['color']) + pack_string(msg['name'])
+        return frame(MSG_JOIN, payload)
+    if msg_type == 'ack':
+        return frame(MSG_ACK, ACK.pack(msg['seq']))
+    return None
+
+def encode(msg, protocol=0):
+    if protocol >= 1:
+        data = encode_binary(msg)
+        if data is not None:
+            return data
+    return encode_json(msg)
+
+def encode_snapshot(seq, state_records, event_frames):
+    # One frame carrying every player's state plus this tick's events.
+    # Events that don't fit in the frame follow as ordinary frames in the same write.
+    payload = SNAPSHOT.pack(seq, len(state_records)) + b''.join(state_records)
+    overflow = []
+    for event in event_frames:
+        if not overflow and len(payload) + len(event) <= MAX_PAYLOAD:
+            payload += event
+        else:
+            overflow.append(event)
+    return frame(MSG_SNAPSHOT, payload) + b''.join(overflow)
+
+def decode_snapshot(payload):
+    seq, count = SNAPSHOT.unpack_from(payload)
+    offset = SNAPSHOT.size
+    messages = []
+    for _ in range(count):
+        messages.append(unpack_state(payload, offset))
+        offset += STATE.size
+    while offset + FRAME_HEADER.size <= len(payload):
+        _, msg_type, length = FRAME_HEADER.unpack_from(payload, offset)
+        start = offset + FRAME_HEADER.size
+        msg = decode_frame(msg_type, payload[start:start + length])
+        if msg is not None:
+            messages.append(msg)
+        offset = start + length
+    return {'type': 'snapshot', 'seq': seq, 'messages': messages}
+
+def decode_frame(msg_type, payload):
+    if msg_type == MSG_STATE:
+        return unpack_state(payload)
+    if msg_type == MSG_SNAPSHOT:
+        return decode_snapshot(payload)
+    if msg_type == MSG_DELTA_SNAPSHOT:
+        return decode_delta_snapshot(payload)
+    if msg_type == MSG_ACK:
+        return {'type': 'ack', 'seq': ACK.unpack(payload)[0]}
+    if msg_type == MSG_BULLET:
+        player_id, x, y, z, yaw, pitch = BULLET.unpack(payload)
+        return {'type': 'bullet', 'player_id': player_id, 'x': x, 'y': y, 'z': z, 'yaw': yaw, 'pitch': pitch}
+    if msg_type == MSG_HIT:
+        target_id, attacker_id, damage, is_kill = HIT.unpack_from(payload)
+        attacker_name, offset = unpack_string(payload, HIT.size)
+        victim_name, _ = unpack_string(payload, offset)
+        msg = {'type': 'hit', 'target_id': target_id, 'attacker_id': attacker_id,
+               'damage': damage, 'attacker_name': attacker_name}
+        if is_kill:
+            msg['is_kill'] = True
+            msg['victim_name'] = victim_name
+        return msg
+    if msg_type == MSG_CHAT:
+        name, offset = unpack_string(payload, 0)
+        text, _ = unpack_string(payload, offset)
+        return {'type': 'chat', 'name': name, 'text': text}
+    if msg_type == MSG_JOIN:
+        player_id, r, g, b = JOIN.unpack_from(payload)
+        name, _ = unpack_string(payload, JOIN.size)
+        return {'type': 'join', 'player_id': player_id, 'name': name, 'color': (r, g, b)}
+    return None  # Unknown frame type from a newer peer, skip it
+
+def hello_message(player_id, name, color):
+    # Handshake: the only place name and color are sent in binary mode
+    return {'type': 'hello', 'protocol': PROTOCOL_VERSION, 'player_id': player_id,
+            'name': name, 'color': list(color)}
+
+def welcome_message(client_protocol, tick_rate=None, world_seed=None):
+    msg = {'type': 'welcome', 'protocol': min(client_protocol, PROTOCOL_VERSION)}
+    if tick_rate:
+        msg['tick_rate'] = tick_rate  # Lets clients turn snapshot sequence numbers into server time
+    if world_seed is not None:
+        msg['world_seed'] = world_seed  # Scenery is generated locally from this; none of it is sent
+    return msg
+
+class StreamDecoder:
+    """Splits a byte stream into messages, accepting both JSON and binary frames."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.json_decoder = json.JSONDecoder()
+
+    def feed(self, data):
+        self.buffer += data
+
+    def messages(self):
+        buffer = self.buffer
+        while buffer:
+            first = buffer[0]
+            if first == FRAME_MAGIC:
+                if len(buffer) < FRAME_HEADER.size:
+                    break
+                _, msg_type, length = FRAME_HEADER.unpack_from(buffer)
+                end = FRAME_HEADER.size + length
+                if len(buffer) < end:
+                    break
+                payload = bytes(buffer[FRAME_HEADER.size:end])
+                del buffer[:end]
+                try:
+                    msg = decode_frame(msg_type, payload)
+                except (struct.error, IndexError):
+                    msg = None  # Malformed frame, drop it
+                if msg is not None:
+                    yield msg
+            elif first in b' \t\r\n':
+                del buffer[0]
+            else:
+                # JSON text runs until the next binary frame (or the end of the buffer)
+                frame_start = buffer.find(FRAME_MAGIC)
+                end = frame_start if frame_start != -1 else len(buffer)
+                try:
+                    text = buffer[:end].decode('utf-8')
+                    msg, index = self.json_decoder.raw_decode(text)
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    if frame_start == -1:
+                        break  # Incomplete message, wait for more data
+                    del buffer[:frame_start]  # Garbage before a frame, skip it
+                    continue
+                del buffer[:len(text[:index].encode('utf-8'))]
+                if isinstance(msg, dict):
+                    yield msg
@@ -0,0 +1,101 @@
+from OpenGL.GL import *
+
+class RenderTarget:
+    """Offscreen RGBA texture behind a framebuffer object. Between begin() and end()
+    drawing goes into the texture with a pixel-aligned 2D projection (origin bottom-left)."""
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        previous_fbo = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, previous_fbo)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            self.release()
+            raise RuntimeError(f"Framebuffer incomplete: {status:#x}")
+        self.previous_fbo = previous_fbo
+
+    def begin(self):
+        self.previous_fbo = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glPushAttrib(GL_VIEWPORT_BIT | GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_SCISSOR_BIT | GL_CURRENT_BIT)
+        glViewport(0, 0, self.width, self.height)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.width, 0, self.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+    def clear(self, x=0, y=0, width=None, height=None):
+        # Clear to transparent, optionally only a rectangle
+        glEnable(GL_SCISSOR_TEST)
+        glScissor(int(x), int(y), int(self.width if width is None else width), int(self.height if height is None else height))
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glDisable(GL_SCISSOR_TEST)
+
+    def end(self):
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, self.previous_fbo)
+
+    def draw(self, x, y, width=None, height=None, u0=0.0, v0=0.0, u1=1.0, v1=1.0):
+        # Textured quad of (part of) the target in the current 2D projection
+        width = self.width if width is None else width
+        height = self.height if height is None else height
+        self.draw_quads([(x, y, width, height, u0, v0, u1, v1)])
+
+    def draw_rects(self, rects):
+        # Copy (x, y, width, height) pixel rects of the target to the same place on screen
+        self.draw_quads([(x, y, w, h, x / self.width, y / self.height, (x + w) / self.width, (y + h) / self.height)
+                         for x, y, w, h in rects])
+
+    def draw_quads(self, quads):
+        # (x, y, width, height, u0, v0, u1, v1) per axis-aligned quad
+        corners = []
+        for x, y, width, height, u0, v0, u1, v1 in quads:
+            corners += [(u0, v0, x, y), (u1, v0, x + width, y), (u1, v1, x + width, y + height), (u0, v1, x, y + height)]
+        self.draw_corners(corners)
+
+    def draw_corners(self, corners):
+        # (u, v, x, y) per corner, four per quad, all in one glBegin/glEnd. The texture holds
+        # premultiplied alpha (see utils.enable_blend), so it is blended with ONE, not SRC_ALPHA.
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT | GL_TEXTURE_BIT)
+        glDisable(GL_LIGHTING)
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_REPLACE)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glBegin(GL_QUADS)
+        for u, v, x, y in corners:
+            glTexCoord2f(u, v)
+            glVertex2f(x, y)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glPopAttrib()
+
+    def release(self):
+        if self.fbo is not None:
+            glDeleteFramebuffers(1, [self.fbo])
+            self.fbo = None
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+            self.texture = None
@@ -0,0 +1,265 @@
+from OpenGL.GL import *
+import numpy as np
+import ctypes
+import time
+import meshes
+from world import chunk_bounds
+from lod import LodSelector, TREE_LOD_PIXELS, CLOUD_LOD_PIXELS, TREE_RADIUS, CLOUD_RADIUS
+
+# Interleaved layout: position (3) + normal (3) + color (3)
+SCENERY_STRIDE = 9 * 4
+
+TRUNK_COLOR = (0.5, 0.35, 0.25)
+CANOPY_COLOR = (0.1, 0.5, 0.1)
+MOUNTAIN_COLOR = (0.5, 0.35, 0.25)
+CLOUD_COLOR = (0.9, 0.9, 0.9)
+
+CLOUD_SPHERE_STEPS = [(8, 4), (4, 2)]  # Longitude x latitude patches per cloud sphere, by LOD
+TREE_LODS = CLOUD_LODS = 3
+
+UPLOAD_BUDGET = 0.002  # Seconds of chunk uploads per frame; at least one chunk always goes up
+
+def colored(vertices, color):
+    vertices = np.asarray(vertices, dtype=np.float32)
+    out = np.empty((len(vertices), 9), dtype=np.float32)
+    out[:, :6] = vertices[:, :6]
+    out[:, 6:] = color
+    return out
+
+def transform(vertices, offset, scale):
+    # Scale/translate a (V, 9) vertex array; normals use the inverse scale
+    out = vertices.copy()
+    out[:, 0:3] = vertices[:, 0:3] * scale + offset
+    normals = vertices[:, 3:6] / scale
+    out[:, 3:6] = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+    return out
+
+def impostor_quads(corners, color):
+    # Flat quads lit as if facing up, so they read the same from every side
+    quads = np.zeros((len(corners), 4, 6), dtype=np.float32)
+    quads[:, :, 0:3] = corners
+    quads[:, :, 4] = 1.0
+    return colored(meshes.quads_to_triangles(quads), color)
+
+def build_tree_mesh(lod=0):
+    # 0: trunk and canopy, 1: canopy only, 2: two crossed quads
+    cube = meshes.build_cube()
+    canopy = transform(colored(cube, CANOPY_COLOR), (0, 3.5, 0), (1.5, 2.0, 1.5))
+    if lod == 0:
+        trunk = transform(colored(cube, TRUNK_COLOR), (0, 1.5, 0), (0.2, 3.0, 0.2))
+        return np.concatenate([trunk, canopy])
+    if lod == 1:
+        return canopy
+    w, top = 0.75, 4.5
+    return impostor_quads([
+        [(-w, 0, 0), (w, 0, 0), (w, top, 0), (-w, top, 0)],
+        [(0, 0, -w), (0, 0, w), (0, top, w), (0, top, -w)],
+    ], CANOPY_COLOR)
+
+def build_mountain_mesh():
+    # Unit pyramid (base half-width 1, height 1), same triangles as Environment.draw_mountain
+    a, b, c, d = (-1, 0, -1), (1, 0, -1), (-1, 0, 1), (1, 0, 1)
+    top = (0, 1, 0)
+    triangles = [
+        (a, b, c), (b, d, c),
+        (top, a, b), (top, b, d), (top, d, c), (top, c, a),
+    ]
+    out = np.zeros((len(triangles) * 3, 9), dtype=np.float32)
+    out[:, 0:3] = np.array(triangles, dtype=np.float32).reshape(-1, 3)
+    out[:, 6:] = MOUNTAIN_COLOR
+    return out
+
+def build_cloud_mesh(lod=0):
+    # Cloud of size 1; five squashed spheres like Environment.draw_cloud, coarser spheres at lod 1
+    # and an upright plus a flat quad along the cloud's diagonal at lod 2
+    if lod == 2:
+        d, w = 0.9, 0.35
+        return impostor_quads([
+            [(-d, -0.3, -d), (d, -0.3, d), (d, 0.5, d), (-d, 0.5, -d)],
+            [(-d, 0.1, -d), (-w, 0.1, w), (d, 0.1, d), (w, 0.1, -w)],
+        ], CLOUD_COLOR)
+    sphere = colored(meshes.build_sphere(*CLOUD_SPHERE_STEPS[lod]), CLOUD_COLOR)
+    parts = []
+    for i in range(5):
+        offset = ((i - 2) * 0.3, (i % 2) * 0.2, (i - 2) * 0.3)
+        parts.append(transform(sphere, offset, (0.4, 0.3, 0.4)))
+    return np.concatenate(parts)
+
+def flat_normals(vertices):
+    # Per-face normals for a triangle list, computed after instancing
+    tris = vertices[:, 0:3].reshape(-1, 3, 3)
+    n = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    n /= np.where(length > 0, length, 1.0)
+    # Keep normals facing up/outwards regardless of winding
+    n *= np.where(n[:, 1:2] < 0, -1.0, 1.0)
+    vertices[:, 3:6] = np.repeat(n, 3, axis=0)
+
+def merge_instances(base, offsets, scales):
+    # base: (V, 9), offsets/scales: (N, 3) -> (N * V, 9) in one vectorized pass
+    n = len(offsets)
+    out = np.empty((n, len(base), 9), dtype=np.float32)
+    out[:, :, 0:3] = base[None, :, 0:3] * scales[:, None, :] + offsets[:, None, :]
+    normals = base[None, :, 3:6] / scales[:, None, :]
+    length = np.linalg.norm(normals, axis=2, keepdims=True)
+    out[:, :, 3:6] = normals / np.where(length > 0, length, 1.0)
+    out[:, :, 6:9] = base[None, :, 6:9]
+    return out.reshape(-1, 9)
+
+class SceneryBatch:
+    def __init__(self, base_mesh, face_normals=False):
+        self.base = base_mesh
+        self.face_normals = face_normals
+        # Per-object transforms, one row per object
+        self.offsets = np.zeros((0, 3), dtype=np.float32)
+        self.scales = np.zeros((0, 3), dtype=np.float32)
+        self.vbo = None
+        self.count = 0
+
+    def set_instances(self, offsets, scales):
+        self.offsets = np.asarray(offsets, dtype=np.float32).reshape(-1, 3)
+        self.scales = np.asarray(scales, dtype=np.float32).reshape(-1, 3)
+        vertices = merge_instances(self.base, self.offsets, self.scales)
+        if self.face_normals and len(vertices):
+            flat_normals(vertices)
+        self.upload(vertices)
+
+    def upload(self, vertices):
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices if len(vertices) else None, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.count = len(vertices)
+
+    def draw(self):
+        if not self.count:
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, SCENERY_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, SCENERY_STRIDE, ctypes.c_void_p(12))
+        glColorPointer(3, GL_FLOAT, SCENERY_STRIDE, ctypes.c_void_p(24))
+        glDrawArrays(GL_TRIANGLES, 0, self.count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+        self.count = 0
+
+_base_meshes = None
+
+def base_meshes():
+    global _base_meshes
+    if _base_meshes is None:
+        _base_meshes = {
+            'mountains': build_mountain_mesh(),
+            'trees': [build_tree_mesh(lod) for lod in range(TREE_LODS)],
+            'clouds': [build_cloud_mesh(lod) for lod in range(CLOUD_LODS)],
+        }
+    return _base_meshes
+
+def build_chunk_arrays(chunk):
+    # Merged vertex arrays for one world chunk, one per LOD for trees and clouds.
+    # Pure NumPy, so it runs on the generation workers.
+    base = base_meshes()
+    trees = np.array(chunk.trees, dtype=np.float32).reshape(-1, 3)
+    mountains = merge_instances(
+        base['mountains'],
+        np.array([m['pos'] for m in chunk.mountains], dtype=np.float32).reshape(-1, 3),
+        np.array([(m['base'], m['height'], m['base']) for m in chunk.mountains], dtype=np.float32).reshape(-1, 3))
+    if len(mountains):
+        flat_normals(mountains)
+    sizes = np.array([c['size'] for c in chunk.clouds], dtype=np.float32)
+    cloud_pos = np.array([c['pos'] for c in chunk.clouds], dtype=np.float32).reshape(-1, 3)
+    cloud_scales = np.repeat(sizes[:, None], 3, axis=1)
+    return {
+        'mountains': mountains,
+        'trees': [merge_instances(mesh, trees, np.ones_like(trees)) for mesh in base['trees']],
+        'clouds': [merge_instances(mesh, cloud_pos, cloud_scales) for mesh in base['clouds']],
+    }
+
+class ChunkMesh:
+    """GPU copy of one chunk's scenery: one VBO per scenery class, and per LOD for trees and clouds."""
+
+    def __init__(self, arrays):
+        self.mountains = self.upload(base_meshes()['mountains'], arrays['mountains'])
+        self.trees = [self.upload(base, vertices) for base, vertices in zip(base_meshes()['trees'], arrays['trees'])]
+        self.clouds = [self.upload(base, vertices) for base, vertices in zip(base_meshes()['clouds'], arrays['clouds'])]
+
+    @staticmethod
+    def upload(base, vertices):
+        batch = SceneryBatch(base)
+        batch.upload(vertices)
+        return batch
+
+    def draw(self, clouds=True, tree_lod=0, cloud_lod=0):
+        self.mountains.draw()
+        self.trees[tree_lod].draw()
+        if clouds:
+            self.clouds[cloud_lod].draw()
+
+    def release(self):
+        for batch in [self.mountains] + self.trees + self.clouds:
+            batch.release()
+
+class SceneryRenderer:
+    """VBOs for the active world chunks. Chunk arrays are built on the generation workers;
+    here they are only uploaded, a time-budgeted few per frame."""
+
+    def __init__(self):
+        self.meshes = {}  # (cx, cz) -> ChunkMesh
+        # Trees and clouds switch LOD per chunk, by the size of one object at the chunk's nearest point
+        self.tree_lod = LodSelector(TREE_LOD_PIXELS)
+        self.cloud_lod = LodSelector(CLOUD_LOD_PIXELS)
+
+    def sync(self, chunks, budget=UPLOAD_BUDGET):
+        active = set((c.cx, c.cz) for c in chunks)
+        for coords in [c for c in self.meshes if c not in active]:
+            self.meshes.pop(coords).release()
+        self.tree_lod.retain(active)
+        self.cloud_lod.retain(active)
+        start = time.perf_counter()
+        uploaded = 0
+        for chunk in chunks:  # Nearest first
+            coords = (chunk.cx, chunk.cz)
+            if coords in self.meshes or chunk.arrays is None:
+                continue
+            if uploaded and time.perf_counter() - start > budget:
+                break  # The rest go up next frame
+            self.meshes[coords] = ChunkMesh(chunk.arrays)
+            uploaded += 1
+
+    def draw(self, chunks, clouds=True, frustum=None, stats=None, view=None):
+        for chunk in chunks:
+            coords = (chunk.cx, chunk.cz)
+            mesh = self.meshes.get(coords)
+            if mesh is None:
+                continue
+            bounds = chunk_bounds(chunk.cx, chunk.cz)
+            if frustum is not None:
+                visible = frustum.box_visible(*bounds)
+                if stats is not None:
+                    stats.count(visible)
+                if not visible:
+                    continue
+            tree_lod = cloud_lod = 0
+            if view is not None:
+                distance = view.box_distance(*bounds)
+                tree_lod = self.tree_lod.select(coords, view.screen_size(TREE_RADIUS, distance))
+                if chunk.clouds:
+                    radius = CLOUD_RADIUS * max(c['size'] for c in chunk.clouds)
+                    cloud_lod = self.cloud_lod.select(coords, view.screen_size(radius, distance))
+            mesh.draw(clouds, tree_lod, cloud_lod)
+
+    def release(self):
+        for mesh in self.meshes.values():
+            mesh.release()
+        self.meshes.clear()
@@ -1,69 +1,367 @@
 import socket
 import threading
-import json
+import asyncio
+import argparse
+import collections
+import math
+import protocol
+from spatial import SpatialGrid
+from world import DEFAULT_WORLD_SEED
 
 HOST = '0.0.0.0'
 PORT = 50007
 
 clients = []
 clients_lock = threading.Lock()
+client_protocols = {}  # conn -> negotiated protocol version (0 = JSON)
+client_players = {}  # conn -> player_id
+player_info = {}  # player_id -> {'name': ..., 'color': ...}
+world_seed = DEFAULT_WORLD_SEED  # Sent in the welcome so every client builds the same world
 
-# Each client sends: {"type": "state"|"bullet"|"chat", ...}
+THREADED_PROTOCOL_VERSION = 1  # The threaded server relays messages; it has no snapshots or deltas
+OUTBOUND_EVENT_LIMIT = 256  # Queued bullets/hits/chat per client before the oldest are dropped
+SEND_BUFFER_LIMIT = 64 * 1024  # Bytes buffered for a client before its snapshots are skipped
+DEFAULT_TICK_RATE = 20
+# Interest management: players within AOI_RADIUS get every tick, the rest every FAR_UPDATE_INTERVAL ticks
+AOI_RADIUS = 300.0
+AOI_CELL_SIZE = 150.0
+FAR_UPDATE_INTERVAL = 6
+MIN_TICK_RATE, MAX_TICK_RATE = 20, 60
+# Filled in for state fields a client left out; x and z (and player_id) are required
+STATE_DEFAULTS = {'y': 0.0, 'yaw': 0.0, 'pitch': 0.0, 'roll': 0.0, 'health': 100, 'score': 0, 'deaths': 0}
+
+# Each client sends: {"type": "hello"|"state"|"bullet"|"chat"|"hit", ...}
+# either as JSON or, after the hello/welcome handshake, as binary frames.
+
+def with_player_info(msg, info_table=player_info):
+    # Binary clients leave name/color out of state messages; JSON clients still expect them
+    if msg.get('type') == 'state' and 'name' not in msg:
+        info = info_table.get(msg.get('player_id'))
+        if info:
+            msg = dict(msg, name=info['name'], color=info['color'])
+    return msg
+
+def normalize_state(msg):
+    # Complete state with numeric fields, or None if it can't be encoded into a snapshot
+    try:
+        state = dict(msg, player_id=int(msg['player_id']), x=float(msg['x']), z=float(msg['z']))
+        for field, default in STATE_DEFAULTS.items():
+            state[field] = type(default)(msg.get(field, default))
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    if not 0 <= state['player_id'] <= 0xFFFF:
+        return None
+    if not all(math.isfinite(state[field]) for field in ('x', 'y', 'z', 'yaw', 'pitch', 'roll')):
+        return None
+    return state
+
+def send_to(conn, msg):
+    try:
+        conn.sendall(protocol.encode(msg, client_protocols.get(conn, 0)))
+    except Exception as e:
+        print(f"Send error to {conn.getpeername()}: {e}")
+
+def broadcast(msg, sender):
+    # Encode once per protocol version rather than once per client
+    encoded = {}
+    with clients_lock:
+        for c in clients:
+            if c != sender:
+                version = client_protocols.get(c, 0)
+                if version not in encoded:
+                    encoded[version] = protocol.encode(with_player_info(msg) if version == 0 else msg, version)
+                try:
+                    c.sendall(encoded[version])
+                except Exception as e:
+                    print(f"Broadcast error to {c.getpeername()}: {e}")
+
+def remember_player(conn, player_id, name, color):
+    # Announce new or changed names/colors to everyone else
+    info = {'name': name, 'color': list(color)}
+    changed = player_info.get(player_id) != info
+    player_info[player_id] = info
+    client_players[conn] = player_id
+    if changed:
+        broadcast({'type': 'join', 'player_id': player_id, 'name': name, 'color': info['color']}, conn)
+
+def handle_message(conn, msg):
+    msg_type = msg.get('type')
+    if msg_type == 'hello':
+        version = min(int(msg.get('protocol', 0)), THREADED_PROTOCOL_VERSION)
+        send_to(conn, protocol.welcome_message(version, world_seed=world_seed))
+        client_protocols[conn] = version
+        remember_player(conn, msg['player_id'], msg.get('name', ''), msg.get('color', (0.8, 0.8, 0.8)))
+        # Tell the newcomer who is already here
+        for player_id, info in list(player_info.items()):
+            if player_id != msg['player_id']:
+                send_to(conn, {'type': 'join', 'player_id': player_id, 'name': info['name'], 'color': info['color']})
+        return
+    if msg_type == 'ack':
+        return  # Only meaningful for delta snapshots, which this server doesn't send
+    if msg_type == 'state' and 'name' in msg:
+        remember_player(conn, msg['player_id'], msg['name'], msg.get('color', (0.8, 0.8, 0.8)))
+    broadcast(msg, conn)
 
 def handle_client(conn, addr):
     print(f"Client connected: {addr}")
-    buffer = ""
+    decoder = protocol.StreamDecoder()
     while True:
         try:
-            data = conn.recv(4096).decode()
+            data = conn.recv(4096)
             if not data:
                 break
-            
-            buffer += data
-            while True:
-                try:
-                    msg, end_index = json.JSONDecoder().raw_decode(buffer)
-                    
-                    # If we successfully decoded a message, broadcast it
-                    broadcast_data = json.dumps(msg).encode()
-                    with clients_lock:
-                        for c in clients:
-                            if c != conn:
-                                try:
-                                    c.sendall(broadcast_data)
-                                except Exception as e:
-                                    print(f"Broadcast error to {c.getpeername()}: {e}")
-                    
-                    # Remove the processed message from the buffer
-                    buffer = buffer[end_index:].lstrip()
-
-                except json.JSONDecodeError:
-                    # Not a complete JSON object yet, wait for more data
-                    break
+
+            decoder.feed(data)
+            for msg in decoder.messages():
+                handle_message(conn, msg)
 
         except ConnectionResetError:
             break # Client forcibly closed connection
         except Exception as e:
             print(f"Error with client {addr}: {e}")
             break
-            
+
     print(f"Client disconnected: {addr}")
     with clients_lock:
         if conn in clients:
             clients.remove(conn)
+        client_protocols.pop(conn, None)
+        player_info.pop(client_players.pop(conn, None), None)
     conn.close()
 
-def main():
+class AsyncClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.addr = writer.get_extra_info('peername')
+        self.protocol = 0
+        self.player_id = None
+        # Encoded bullets/hits/chat/joins waiting for the next snapshot, oldest dropped first
+        self.pending_events = collections.deque(maxlen=OUTBOUND_EVENT_LIMIT)
+        # Delta snapshots (protocol 2): what we sent per sequence, and what the client has acked
+        self.sent_states = collections.OrderedDict()
+        self.acked_seq = 0
+        self.sent_updates = {}  # player_id -> that player's update count when last sent to us
+
+    def is_congested(self):
+        return self.writer.transport.get_write_buffer_size() > SEND_BUFFER_LIMIT
+
+    def write(self, data):
+        # Non-blocking; the transport buffers whatever the socket can't take yet
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+class AsyncGameServer:
+    def __init__(self, tick_rate=DEFAULT_TICK_RATE, world_seed=DEFAULT_WORLD_SEED):
+        self.clients = set()
+        self.world_seed = world_seed
+        self.player_info = {}
+        self.states = {}  # player_id -> latest state message (authoritative table)
+        self.updates = {}  # player_id -> number of states received, so a state is only sent once
+        self.tick_rate = tick_rate
+        self.snapshot_seq = 0
+        self.grid = SpatialGrid(AOI_CELL_SIZE)  # player_id -> (x, z)
+
+    def interest_set(self, client):
+        # Player ids in the client's area of interest, or None if we don't know where it is yet
+        pos = self.grid.positions.get(client.player_id)
+        if pos is None:
+            return None
+        return set(self.grid.query_radius(pos[0], pos[1], AOI_RADIUS))
+
+    def is_due(self, player_id):
+        # Far players are staggered so their reduced-rate updates spread across ticks
+        return (self.snapshot_seq + player_id) % FAR_UPDATE_INTERVAL == 0
+
+    def queue_event(self, msg, sender):
+        # Encode once per protocol version; delivered with the next snapshot
+        encoded = {}
+        audience = None
+        if msg.get('type') == 'bullet':
+            # Bullets only matter to players near where they were fired
+            audience = set(self.grid.query_radius(msg['x'], msg['z'], AOI_RADIUS))
+        for c in self.clients:
+            if c is not sender:
+                if audience is not None and c.player_id in self.grid and c.player_id not in audience:
+                    continue
+                if c.protocol not in encoded:
+                    encoded[c.protocol] = protocol.encode(msg, c.protocol)
+                c.pending_events.append(encoded[c.protocol])
+
+    def remember_player(self, client, player_id, name, color):
+        info = {'name': name, 'color': list(color)}
+        changed = self.player_info.get(player_id) != info
+        self.player_info[player_id] = info
+        client.player_id = player_id
+        if changed:
+            self.queue_event({'type': 'join', 'player_id': player_id, 'name': name, 'color': info['color']}, client)
+
+    def handle_message(self, client, msg):
+        msg_type = msg.get('type')
+        if msg_type == 'hello':
+            client.protocol = min(int(msg.get('protocol', 0)), protocol.PROTOCOL_VERSION)
+            # The welcome itself always goes out as JSON
+            client.write(protocol.encode(protocol.welcome_message(client.protocol, self.tick_rate, self.world_seed)))
+            self.remember_player(client, msg['player_id'], msg.get('name', ''), msg.get('color', (0.8, 0.8, 0.8)))
+            for player_id, info in self.player_info.items():
+                if player_id != msg['player_id']:
+                    join = {'type': 'join', 'player_id': player_id, 'name': info['name'], 'color': info['color']}
+                    client.pending_events.append(protocol.encode(join, client.protocol))
+            return
+        if msg_type == 'ack':
+            client.acked_seq = max(client.acked_seq, msg['seq'])
+            return
+        if msg_type == 'state':
+            msg = normalize_state(msg)
+            if msg is None:
+                print(f"Dropped malformed state from {client.addr}")
+                return
+            if 'name' in msg:
+                self.remember_player(client, msg['player_id'], msg['name'], msg.get('color', (0.8, 0.8, 0.8)))
+            client.player_id = msg['player_id']
+            self.states[msg['player_id']] = msg
+            self.updates[msg['player_id']] = self.updates.get(msg['player_id'], 0) + 1
+            self.grid.insert(msg['player_id'], msg['x'], msg['z'])
+            return
+        self.queue_event(msg, client)
+
+    def send_snapshots(self):
+        self.snapshot_seq += 1
+        # Encode every state once per protocol version, then assemble per client
+        records = {}
+        for c in self.clients:
+            if c.protocol in records:
+                continue
+            if c.protocol >= 2:
+                records[c.protocol] = {pid: protocol.quantize_state(msg) for pid, msg in self.states.items()}
+            elif c.protocol >= 1:
+                records[c.protocol] = {pid: protocol.pack_state(msg) for pid, msg in self.states.items()}
+            else:
+                records[c.protocol] = {pid: protocol.encode_json(with_player_info(msg, self.player_info))
+                                       for pid, msg in self.states.items()}
+
+        for c in self.clients:
+            if c.is_congested():
+                continue  # Skip this tick's (now stale) states; events stay queued
+            events = list(c.pending_events)
+            c.pending_events.clear()
+            near = self.interest_set(c)
+            if c.protocol >= 2:
+                c.write(self.encode_delta_snapshot(c, records[c.protocol], events, near))
+                continue
+            states = [data for pid, data in records[c.protocol].items() if self.is_sendable(c, pid, near)]
+            if c.protocol >= 1:
+                c.write(protocol.encode_snapshot(self.snapshot_seq, states, events))
+            elif states or events:
+                c.write(b''.join(states + events))
+
+    def is_sendable(self, client, pid, near):
+        # True if pid has a state the client hasn't had yet and is near or due; marks it sent.
+        # Resending an old state would give the client a repeated pose at a later time.
+        if pid == client.player_id or client.sent_updates.get(pid) == self.updates.get(pid):
+            return False
+        if near is not None and pid not in near and not self.is_due(pid):
+            return False
+        client.sent_updates[pid] = self.updates.get(pid)
+        return True
+
+    def encode_delta_snapshot(self, client, quantized, events, near):
+        # Delta against the newest snapshot the client has acked; full snapshot if we no longer have it
+        baseline = client.sent_states.get(client.acked_seq)
+        baseline_seq = client.acked_seq if baseline is not None else 0
+        states = {}
+        held = set()
+        for pid, q in quantized.items():
+            if pid == client.player_id:
+                continue
+            if not self.is_sendable(client, pid, near) and baseline and pid in baseline:
+                q = baseline[pid]  # Nothing new to send: the client keeps its last sample
+                held.add(pid)
+            states[pid] = q
+        client.sent_states[self.snapshot_seq] = states
+        while len(client.sent_states) > protocol.SNAPSHOT_HISTORY:
+            client.sent_states.popitem(last=False)
+        return protocol.encode_delta_snapshot(self.snapshot_seq, baseline_seq, baseline or {}, states, events, held)
+
+    async def tick_loop(self):
+        interval = 1.0 / self.tick_rate
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                self.send_snapshots()
+            except Exception as e:
+                # One bad state must not stop snapshots for everyone
+                print(f"Error sending snapshots: {e!r}")
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def handle_connection(self, reader, writer):
+        client = AsyncClient(reader, writer)
+        print(f"Client connected: {client.addr}")
+        self.clients.add(client)
+        decoder = protocol.StreamDecoder()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                decoder.feed(data)
+                for msg in decoder.messages():
+                    self.handle_message(client, msg)
+        except ConnectionError:
+            pass # Client forcibly closed connection
+        except Exception as e:
+            print(f"Error with client {client.addr}: {e}")
+        finally:
+            print(f"Client disconnected: {client.addr}")
+            self.clients.discard(client)
+            self.player_info.pop(client.player_id, None)
+            self.states.pop(client.player_id, None)
+            self.updates.pop(client.player_id, None)
+            for c in self.clients:
+                c.sent_updates.pop(client.player_id, None)
+            self.grid.remove(client.player_id)
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, reuse_address=True)
+        print(f"Server listening on {host}:{port} (asyncio, {self.tick_rate} Hz)")
+        tick_task = asyncio.create_task(self.tick_loop())
+        async with server:
+            await server.serve_forever()
+        tick_task.cancel()
+
+def run_threaded(host, port):
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind((HOST, PORT))
+    s.bind((host, port))
     s.listen()
-    print(f"Server listening on {HOST}:{PORT}")
+    print(f"Server listening on {host}:{port}")
     while True:
         conn, addr = s.accept()
         with clients_lock:
             clients.append(conn)
         threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
 
+def main():
+    global world_seed
+    parser = argparse.ArgumentParser(description="Flight Simulator game server")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--threaded', action='store_true', help="use the legacy thread-per-client server")
+    parser.add_argument('--tick-rate', type=int, default=DEFAULT_TICK_RATE,
+                        help=f"snapshot rate in Hz ({MIN_TICK_RATE}-{MAX_TICK_RATE})")
+    parser.add_argument('--world-seed', type=int, default=DEFAULT_WORLD_SEED,
+                        help="seed every client generates the scenery from")
+    args = parser.parse_args()
+    if not MIN_TICK_RATE <= args.tick_rate <= MAX_TICK_RATE:
+        parser.error(f"--tick-rate must be between {MIN_TICK_RATE} and {MAX_TICK_RATE}")
+    if args.threaded:
+        world_seed = args.world_seed
+        run_threaded(args.host, args.port)
+    else:
+        asyncio.run(AsyncGameServer(args.tick_rate, args.world_seed).serve(args.host, args.port))
+
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
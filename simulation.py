@@ -0,0 +1,116 @@
+import argparse
+import random
+import time
+
+from flight_model import PlaneModel
+from world import World, ObstacleIndex
+
+DEFAULT_TICK_RATE = 60
+
+class Simulation:
+    """Headless world of planes, bullets and hits on a fixed tick, with no window or audio.
+    step() runs as fast as the CPU allows, so it can go faster than real time."""
+
+    def __init__(self, tick_rate=DEFAULT_TICK_RATE, terrain=None):
+        self.dt = 1.0 / tick_rate
+        self.terrain = terrain  # e.g. an ObstacleIndex; None is flat ground
+        self.ticks = 0
+        self.planes = {}  # player_id -> PlaneModel
+        self.controllers = {}  # player_id -> callable(plane, sim) returning apply_controls() arguments
+
+    @property
+    def time(self):
+        return self.ticks * self.dt
+
+    def add_plane(self, player_id, stats=None, controller=None):
+        plane = PlaneModel(0, 0, 0, plane_id=player_id)
+        plane.terrain = self.terrain
+        if stats:
+            plane.set_properties_from_selection(stats)
+        self.planes[player_id] = plane
+        if controller is not None:
+            self.controllers[player_id] = controller
+        return plane
+
+    def remove_plane(self, player_id):
+        self.planes.pop(player_id, None)
+        self.controllers.pop(player_id, None)
+
+    def step(self):
+        # Advance every plane one tick, then apply the hits the way clients do when the server relays them
+        planes = list(self.planes.values())
+        events = []
+        for plane in planes:
+            controller = self.controllers.get(plane.player_id)
+            if controller is not None:
+                plane.apply_controls(dt=self.dt, **controller(plane, self))
+            events += plane.update(planes, self.dt) or []
+        for event in events:
+            target = self.planes.get(event['target_id'])
+            if target is not None:
+                target.health -= event['damage']
+        self.ticks += 1
+        return events
+
+    def run(self, seconds):
+        events = []
+        for _ in range(int(round(seconds / self.dt))):
+            events += self.step()
+        return events
+
+class WanderingBot:
+    """Takes off, climbs to cruise height, then banks at random and fires in bursts."""
+
+    def __init__(self, seed=None, cruise_altitude=60.0):
+        self.rng = random.Random(seed)
+        self.cruise_altitude = cruise_altitude
+        self.roll = 0
+        self.next_turn = 0.0
+
+    def __call__(self, plane, sim):
+        if sim.time >= self.next_turn:
+            self.roll = self.rng.choice((-1, 0, 0, 1))
+            self.next_turn = sim.time + self.rng.uniform(1.0, 4.0)
+        target_pitch = 10.0 if plane.y < self.cruise_altitude else 0.0
+        if plane.pitch < target_pitch - 1.0:
+            pitch = 1
+        elif plane.pitch > target_pitch + 1.0:
+            pitch = -1
+        else:
+            pitch = 0
+        return {
+            'throttle': 1,
+            'pitch': pitch,
+            'roll': self.roll if plane.is_airborne else 0,
+            'fire': self.rng.random() < 0.3,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the flight model headless, as fast as possible")
+    parser.add_argument('--planes', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=60.0, help="simulated time")
+    parser.add_argument('--tick-rate', type=int, default=DEFAULT_TICK_RATE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--world-seed', type=int, default=None, help="collide with the scenery of this world")
+    args = parser.parse_args()
+
+    terrain = None
+    if args.world_seed is not None:
+        world = World(args.world_seed)
+        world.update([0, 0, 0], wait=True)
+        terrain = ObstacleIndex()
+        terrain.rebuild(world.active_chunks([0, 0, 0]))
+        world.close()
+    sim = Simulation(args.tick_rate, terrain)
+    for i in range(args.planes):
+        sim.add_plane(i + 1, controller=WanderingBot(args.seed + i))
+    start = time.perf_counter()
+    events = sim.run(args.seconds)
+    elapsed = time.perf_counter() - start
+    kills = sum(1 for e in events if e.get('is_kill'))
+    print(f"Simulated {args.seconds:.0f}s with {args.planes} planes in {elapsed:.2f}s "
+          f"({args.seconds / elapsed:.1f}x real time, {sim.ticks / elapsed:.0f} ticks/s); "
+          f"{len(events)} hits, {kills} kills")
+
+if __name__ == '__main__':
+    main()
@@ -1,64 +1,103 @@
-import pygame
+import ctypes
+import numpy as np
 from OpenGL.GL import *
+import assets
+
+SKYBOX_SIZE = 100 # Increased size to avoid clipping
+
+SKYBOX_FACES = [
+    (GL_TEXTURE_CUBE_MAP_POSITIVE_X, 'assets/skybox/Daylight Box_Right.bmp'),
+    (GL_TEXTURE_CUBE_MAP_NEGATIVE_X, 'assets/skybox/Daylight Box_Left.bmp'),
+    (GL_TEXTURE_CUBE_MAP_POSITIVE_Y, 'assets/skybox/Daylight Box_Top.bmp'),
+    (GL_TEXTURE_CUBE_MAP_NEGATIVE_Y, 'assets/skybox/Daylight Box_Bottom.bmp'),
+    (GL_TEXTURE_CUBE_MAP_POSITIVE_Z, 'assets/skybox/Daylight Box_Front.bmp'),
+    (GL_TEXTURE_CUBE_MAP_NEGATIVE_Z, 'assets/skybox/Daylight Box_Back.bmp'),
+]
+
+def build_cube_vertices(size):
+    # 36 corners of the inside of a cube as (x, y, z, s, t, r). The texture coordinate is the
+    # direction of the corner, except that the side images lie on their side and are turned a
+    # quarter turn back around the x axis (on the coordinates, so the cached pixels are used as they are).
+    turns = {0: lambda x, y, z: (x, -z, y), 1: lambda x, y, z: (x, z, -y)}  # -X, +X
+    corners = np.array([(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=np.float32)
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    vertices = []
+    for face, quad in enumerate(faces):
+        for i in (quad[0], quad[1], quad[2], quad[0], quad[2], quad[3]):
+            x, y, z = corners[i]
+            direction = turns[face](x, y, z) if face in turns else (x, y, z)
+            vertices.append((x * size, y * size, z * size) + direction)
+    return np.array(vertices, dtype=np.float32)
+
+def load_faces():
+    # The six face textures, in SKYBOX_FACES order. No GL, so it can run on a loader thread.
+    return [assets.load_texture(path) for target, path in SKYBOX_FACES]
 
 class Skybox:
-    def __init__(self):
-        self.textures = self.load_skybox_textures()
+    """One cube map texture and one static vertex buffer, drawn with a single glDrawArrays."""
+
+    def __init__(self, faces=None):
+        for _ in self.build(faces or load_faces()):
+            pass
 
-    def load_skybox_textures(self):
-        texture_paths = [
-            'assets/skybox/Daylight Box_Right.bmp', 'assets/skybox/Daylight Box_Left.bmp',
-            'assets/skybox/Daylight Box_Top.bmp', 'assets/skybox/Daylight Box_Bottom.bmp',
-            'assets/skybox/Daylight Box_Front.bmp', 'assets/skybox/Daylight Box_Back.bmp'
-        ]
-        textures = []
-        for path in texture_paths:
-            texture_surface = pygame.image.load(path)
-            texture_data = pygame.image.tostring(texture_surface, "RGB", True)
-            tex_id = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, tex_id)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, texture_surface.get_width(), texture_surface.get_height(), 0, GL_RGB, GL_UNSIGNED_BYTE, texture_data)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            textures.append(tex_id)
-        return textures
+    def build(self, faces):
+        # GL setup, yielding after each cube face so an AssetManager can spread it over frames
+        yield from self.load_cube_map(faces)
+        vertices = build_cube_vertices(SKYBOX_SIZE)
+        self.count = len(vertices)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def load_cube_map(self, faces):
+        self.texture = glGenTextures(1)
+        for (target, path), face in zip(SKYBOX_FACES, faces):
+            glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+            face.upload(target)  # Memory-mapped pixels and mipmaps from the asset cache
+            glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+            yield
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        for wrap in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_CUBE_MAP, wrap, GL_CLAMP_TO_EDGE)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
 
     def draw(self, player_pos):
         glPushMatrix()
         # Move the skybox to the player's position so it's always surrounding the camera
         glTranslatef(player_pos[0], player_pos[1], player_pos[2])
 
-        size = 100 # Increased size to avoid clipping
+        glPushAttrib(GL_ENABLE_BIT | GL_DEPTH_BUFFER_BIT | GL_CURRENT_BIT | GL_TEXTURE_BIT)
         glDisable(GL_LIGHTING)
         glDepthMask(GL_FALSE)
         glColor3f(1.0, 1.0, 1.0) # Reset color to white
-        
-        quads = [
-            # Right
-            [self.textures[0], [size, -size, -size], [size, size, -size], [size, size, size], [size, -size, size]],
-            # Left
-            [self.textures[1], [-size, -size, size], [-size, size, size], [-size, size, -size], [-size, -size, -size]],
-            # Top
-            [self.textures[2], [-size, size, size], [size, size, size], [size, size, -size], [-size, size, -size]],
-            # Bottom
-            [self.textures[3], [-size, -size, -size], [size, -size, -size], [size, -size, size], [-size, -size, size]],
-            # Front
-            [self.textures[4], [-size, -size, size], [size, -size, size], [size, size, size], [-size, size, size]],
-            # Back
-            [self.textures[5], [size, -size, -size], [-size, -size, -size], [-size, size, -size], [size, size, -size]]
-        ]
+        glEnable(GL_TEXTURE_CUBE_MAP)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self.texture)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 24, ctypes.c_void_p(0))
+        glTexCoordPointer(3, GL_FLOAT, 24, ctypes.c_void_p(12))
+        glDrawArrays(GL_TRIANGLES, 0, self.count)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glBindTexture(GL_TEXTURE_CUBE_MAP, 0)
+        glPopAttrib()
+        glPopMatrix()
+
+    @classmethod
+    def staged(cls, faces):
+        # Upload for AssetManager.load: a generator returning the finished Skybox
+        skybox = cls.__new__(cls)
+        yield from skybox.build(faces)
+        return skybox
 
-        glEnable(GL_TEXTURE_2D)
-        for tex_id, v1, v2, v3, v4 in quads:
-            glBindTexture(GL_TEXTURE_2D, tex_id)
-            glBegin(GL_QUADS)
-            glTexCoord2f(0, 0); glVertex3fv(v1)
-            glTexCoord2f(1, 0); glVertex3fv(v2)
-            glTexCoord2f(1, 1); glVertex3fv(v3)
-            glTexCoord2f(0, 1); glVertex3fv(v4)
-            glEnd()
-        glDisable(GL_TEXTURE_2D)
-        
-        glDepthMask(GL_TRUE)
-        glEnable(GL_LIGHTING)
-        glPopMatrix() 
\ No newline at end of file
+    def release(self):
+        glDeleteBuffers(1, [self.vbo])
+        glDeleteTextures([self.texture])
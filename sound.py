@@ -1,23 +1,30 @@
 import pygame
+import assets
 
 sounds = {}
 channels = {}
 
-def load_sounds():
-    global sounds, channels
+SOUND_FILES = {
+    'engine': 'sounds/engine.wav',
+    'wind': 'sounds/wind.wav',
+    'shoot': 'sounds/shoot.wav',
+    'stall': 'sounds/stall_warning.wav'
+}
+
+def init_mixer():
     pygame.mixer.pre_init(44100, -16, 2, 2048)
     pygame.mixer.init()
-    
-    sound_files = {
-        'engine': 'sounds/engine.wav',
-        'wind': 'sounds/wind.wav',
-        'shoot': 'sounds/shoot.wav',
-        'stall': 'sounds/stall_warning.wav'
-    }
-
-    for name, path in sound_files.items():
+
+def load_sounds():
+    init_mixer()
+    load_sound_files()
+
+def load_sound_files():
+    # Needs init_mixer() first; safe to run on a loader thread
+    global sounds, channels
+    for name, path in SOUND_FILES.items():
         try:
-            sounds[name] = pygame.mixer.Sound(path)
+            sounds[name] = assets.load_sound(path)  # PCM memory-mapped from the asset cache
         except (pygame.error, FileNotFoundError) as e:
             print(f"Warning: Could not load sound '{name}' from {path}. Error: {e}")
             sounds[name] = None
@@ -0,0 +1,72 @@
+import math
+
+class SpatialGrid:
+    """Uniform grid over the ground plane (x, z). Keys are any hashable id."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cz) -> set of keys
+        self.positions = {}  # key -> (x, z)
+
+    def cell_of(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def insert(self, key, x, z):
+        # Inserting an existing key moves it
+        old = self.positions.get(key)
+        if old is not None:
+            old_cell = self.cell_of(*old)
+            if old_cell == self.cell_of(x, z):
+                self.positions[key] = (x, z)
+                return
+            self.remove(key)
+        self.positions[key] = (x, z)
+        self.cells.setdefault(self.cell_of(x, z), set()).add(key)
+
+    def remove(self, key):
+        pos = self.positions.pop(key, None)
+        if pos is None:
+            return
+        cell = self.cell_of(*pos)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def candidates(self, x, z, radius):
+        # Keys in every cell overlapped by the query square (may be farther than radius)
+        min_cx, min_cz = self.cell_of(x - radius, z - radius)
+        max_cx, max_cz = self.cell_of(x + radius, z + radius)
+        for cx in range(min_cx, max_cx + 1):
+            for cz in range(min_cz, max_cz + 1):
+                bucket = self.cells.get((cx, cz))
+                if bucket:
+                    yield from bucket
+
+    def query_radius(self, x, z, radius):
+        radius_sq = radius * radius
+        result = []
+        for key in self.candidates(x, z, radius):
+            kx, kz = self.positions[key]
+            if (kx - x) ** 2 + (kz - z) ** 2 < radius_sq:
+                result.append(key)
+        return result
+
+    def any_within(self, x, z, radius):
+        radius_sq = radius * radius
+        for key in self.candidates(x, z, radius):
+            kx, kz = self.positions[key]
+            if (kx - x) ** 2 + (kz - z) ** 2 < radius_sq:
+                return True
+        return False
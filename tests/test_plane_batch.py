@@ -0,0 +1,114 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from flight_model import PlaneModel, BASE_TICK_RATE
+from plane_batch import PlaneBatch, FLOAT_FIELDS, BOOL_FIELDS, GROUND_LEVEL
+from world import ObstacleIndex, generate_chunk
+
+def random_planes(n, rng, terrain=None):
+    # Planes spread over every regime: taxiing, climbing, stalling, damaged, out of fuel
+    planes = []
+    for i in range(n):
+        p = PlaneModel(0, 0, 0, plane_id=i)
+        p.terrain = terrain
+        p.wheel_angle = 0.0
+        p.x, p.z = rng.uniform(-500, 500), rng.uniform(-500, 500)
+        p.is_airborne = rng.random() < 0.7
+        p.y = rng.uniform(2, 300) if p.is_airborne else GROUND_LEVEL
+        p.last_y = p.y
+        p.yaw = rng.uniform(-180, 180)
+        p.pitch = rng.uniform(-30, 30)
+        p.roll = rng.uniform(-40, 40)
+        p.velocity = rng.uniform(0, 2)
+        p.thrust_level = rng.random()
+        p.fuel = rng.choice((100.0, 0.5, 0.0))
+        p.damage = rng.choice((0.0, 60.0, 90.0))
+        p.engine_health = rng.choice((100.0, 25.0))
+        planes.append(p)
+    return planes
+
+def low_planes(n, rng, terrain):
+    # Airborne planes just around and above the mountains and trees, so some fly into them
+    planes = random_planes(n, rng, terrain)
+    obstacles = [(m['pos'][0], m['pos'][2], m['base']) for m in terrain.mountains]
+    obstacles += [(t[0], t[2], 3.0) for t in terrain.trees]
+    for p in planes:
+        ox, oz, reach = rng.choice(obstacles)
+        p.x, p.z = ox + rng.uniform(-reach, reach), oz + rng.uniform(-reach, reach)
+        p.is_airborne = True
+        p.y = p.last_y = rng.uniform(2, 35)
+    return planes
+
+def randomize_controls(planes, rng):
+    for p in planes:
+        p.pitch_rate = 0.5 * rng.choice((-1, 0, 0, 1))
+        p.target_roll_angle = 30.0 * rng.choice((-1, 0, 0, 1))
+        p.ground_turn_rate = rng.choice((-1.0, 0.0, 1.0))
+
+def run_parity(make_planes, ticks, dt, seed=0, terrain=None, tolerance=1e-6):
+    # Step identical planes through PlaneModel.update and PlaneBatch.step and compare every field
+    scalar = make_planes(random.Random(seed))
+    mirror = make_planes(random.Random(seed))
+    batch = PlaneBatch.from_planes(mirror, terrain)
+    for tick in range(ticks):
+        if tick % 30 == 0:
+            randomize_controls(scalar, random.Random(seed + tick))
+            randomize_controls(mirror, random.Random(seed + tick))
+            for name in ('pitch_rate', 'target_roll_angle', 'ground_turn_rate'):
+                getattr(batch, name)[:] = [getattr(p, name) for p in mirror]
+        for p in scalar:
+            if p.health > 0:
+                p.update(None, dt)
+        batch.step(dt)
+
+        for i, p in enumerate(scalar):
+            expected = (p.x, p.y, p.z) + tuple(getattr(p, name) for name in FLOAT_FIELDS)
+            actual = tuple(batch.pos[i]) + tuple(getattr(batch, name)[i] for name in FLOAT_FIELDS)
+            for name, a, b in zip(('x', 'y', 'z') + FLOAT_FIELDS, expected, actual):
+                assert math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance), \
+                    f"tick {tick}, plane {i}: {name} {a} != {b}"
+            for name in BOOL_FIELDS:
+                assert getattr(p, name) == getattr(batch, name)[i], f"tick {tick}, plane {i}: {name}"
+    return scalar
+
+@pytest.mark.parametrize('n, dt', [(200, 1.0 / BASE_TICK_RATE), (200, 1.0 / 30), (200, 1.0 / 120),
+                                   (2000, 1.0 / BASE_TICK_RATE)])
+def test_batch_matches_scalar_on_flat_ground(n, dt):
+    run_parity(lambda rng: random_planes(n, rng), ticks=100, dt=dt)
+
+@pytest.mark.parametrize('dt', [1.0 / BASE_TICK_RATE, 1.0 / 30, 1.0 / 120])
+def test_batch_matches_scalar_over_terrain(dt):
+    terrain = ObstacleIndex()
+    terrain.rebuild([generate_chunk(1337, cx, cz) for cx in range(-2, 3) for cz in range(-2, 3)])
+    planes = run_parity(lambda rng: low_planes(300, rng, terrain), ticks=100, dt=dt, terrain=terrain)
+    # Make sure the collision path was exercised
+    assert any(p.health == 0 and p.y > GROUND_LEVEL for p in planes)
+
+@pytest.mark.parametrize('tick_rate', [20, 30, 120])
+def test_engine_failure_is_tick_rate_independent(tick_rate):
+    # A critically damaged engine loses the same thrust per second at any tick rate
+    def thrust_after_one_second(tick_rate):
+        plane = PlaneModel(0, 100, 0)
+        plane.is_airborne = True
+        plane.thrust_level = 1.0
+        plane.damage, plane.engine_health = 90.0, 10.0
+        batch = PlaneBatch.from_planes([plane])
+        for _ in range(tick_rate):
+            plane.update(None, 1.0 / tick_rate)
+            batch.step(1.0 / tick_rate)
+        return plane.thrust_level, batch.thrust_level[0]
+    expected, _ = thrust_after_one_second(BASE_TICK_RATE)
+    for thrust in thrust_after_one_second(tick_rate):
+        assert math.isclose(thrust, expected, rel_tol=1e-9)
+
+def test_heights_at_matches_height_at():
+    terrain = ObstacleIndex()
+    terrain.rebuild([generate_chunk(1337, cx, cz) for cx in range(-1, 2) for cz in range(-1, 2)])
+    rng = random.Random(1)
+    points = [(m['pos'][0] + rng.uniform(-25, 25), m['pos'][2] + rng.uniform(-25, 25)) for m in terrain.mountains for _ in range(20)]
+    points += [(t[0] + rng.uniform(-1, 1), t[2] + rng.uniform(-1, 1)) for t in terrain.trees]
+    xs, zs = np.array(points).T
+    assert list(terrain.heights_at(xs, zs)) == [terrain.height_at(x, z) for x, z in points]
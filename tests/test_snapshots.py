@@ -0,0 +1,67 @@
+import pytest
+
+import protocol
+from interpolation import SnapshotBuffer
+from server import AsyncClient, AsyncGameServer
+
+class FakeTransport:
+    def get_write_buffer_size(self):
+        return 0
+
+class FakeWriter:
+    """Just enough of asyncio.StreamWriter for AsyncClient; keeps everything written."""
+
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.data = b''
+
+    def get_extra_info(self, name):
+        return ('test', 0)
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.data += data
+
+def state(player_id, x):
+    return {'type': 'state', 'player_id': player_id, 'x': x, 'y': 20.0, 'z': 0.0}
+
+def run_session(client_protocol, tick_rate, send_rate, seconds=5):
+    # Player 1 sends states at send_rate into a server ticking at tick_rate; returns the
+    # samples player 2's client pushes into its interpolation buffer for player 1
+    server = AsyncGameServer(tick_rate=tick_rate)
+    sender = AsyncClient(None, FakeWriter())
+    receiver = AsyncClient(None, FakeWriter())
+    receiver.protocol = client_protocol
+    server.clients.update((sender, receiver))
+    server.handle_message(receiver, state(2, 0.0))
+
+    decoder = protocol.StreamDecoder()
+    history = protocol.SnapshotHistory()
+    buffer = SnapshotBuffer(size=10000)
+    sends = 0
+    for tick in range(int(seconds * tick_rate)):
+        # Every state sent since the last tick arrives before it
+        while sends / send_rate <= tick / tick_rate:
+            sends += 1
+            server.handle_message(sender, state(1, float(sends)))
+        server.send_snapshots()
+        decoder.feed(receiver.writer.data)
+        receiver.writer.data = b''
+        for msg in decoder.messages():
+            if msg['type'] == 'delta_snapshot':
+                msg = history.apply(msg)
+                server.handle_message(receiver, {'type': 'ack', 'seq': history.latest_seq})
+            for sub_msg in msg['messages']:
+                if sub_msg['type'] == 'state' and sub_msg['player_id'] == 1:
+                    buffer.push(msg['seq'] / tick_rate, (sub_msg['x'], sub_msg['y'], sub_msg['z']))
+    return [pose for _, pose in buffer.samples]
+
+@pytest.mark.parametrize('client_protocol', [1, 2])
+@pytest.mark.parametrize('tick_rate, send_rate', [(60, 20), (20, 20.3), (20, 19.7)])
+def test_snapshots_carry_no_repeated_poses(client_protocol, tick_rate, send_rate):
+    samples = run_session(client_protocol, tick_rate, send_rate)
+    assert len(samples) > 50
+    for a, b in zip(samples, samples[1:]):
+        assert b[0] > a[0], f"pose {a} repeated or went backwards"
@@ -1,17 +1,25 @@
 import pygame
 from OpenGL.GL import *
 import math
+import ctypes
+import numpy as np
+import meshes
+import fonts
+
+TRACER_LENGTH = 1.2
+
+def enable_blend():
+    # Usual alpha blending for colour; alpha accumulates as coverage, so anything drawn into an
+    # offscreen target (RenderTarget) comes out premultiplied and composites correctly later
+    glEnable(GL_BLEND)
+    glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
 
 def draw_text(x, y, text, font_size=24):
-    font = pygame.font.Font(None, font_size)
-    text_surface = font.render(text, True, (255, 255, 255, 255), (0, 0, 0, 0))
-    text_data = pygame.image.tostring(text_surface, "RGBA", True)
-    glWindowPos2d(x, y)
-    glDrawPixels(text_surface.get_width(), text_surface.get_height(), GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+    # Glyph-atlas text; fonts and laid-out strings are cached in fonts.py
+    fonts.draw_string(x, y, text, font_size)
 
 def draw_throttle(x, y, width, height, thrust_level):
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    enable_blend()
     
     # Draw tick marks for reference
     glColor4f(1.0, 1.0, 1.0, 0.4)
@@ -89,6 +97,18 @@ def draw_compass(x, y, radius, yaw):
     glEnd()
 
 def draw_cylinder(radius=0.5, length=0.2, slices=24):
+    if meshes.USE_VBO:
+        meshes.draw_mesh(('cylinder', radius, length, slices))
+    else:
+        draw_cylinder_immediate(radius, length, slices)
+
+def draw_cube():
+    if meshes.USE_VBO:
+        meshes.draw_mesh(('cube',))
+    else:
+        draw_cube_immediate()
+
+def draw_cylinder_immediate(radius=0.5, length=0.2, slices=24):
     # Draw a simple cylinder along the X axis
     glBegin(GL_QUAD_STRIP)
     for i in range(slices + 1):
@@ -108,8 +128,7 @@ def draw_cylinder(radius=0.5, length=0.2, slices=24):
             glVertex3f(x, y, z)
         glEnd()
 
-def draw_cube():
-    # ... (code from Plane.draw_cube)
+def draw_cube_immediate():
     glBegin(GL_QUADS)
     # Front face
     glNormal3f(0, 0, 1)
@@ -174,8 +193,7 @@ def draw_health_bar(x, y, width, height, health, max_health=100):
 
 def draw_hud_box(x, y, width, height, alpha=0.5):
     glColor4f(0.1, 0.1, 0.1, alpha)
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    enable_blend()
     glBegin(GL_QUADS)
     glVertex2f(x, y)
     glVertex2f(x + width, y)
@@ -185,8 +203,7 @@ def draw_hud_box(x, y, width, height, alpha=0.5):
     glDisable(GL_BLEND) 
 
 def draw_rounded_box(x, y, width, height, radius=12, color=(0.1,0.1,0.1,0.7)):
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    enable_blend()
     glColor4f(*color)
     # Center rectangle
     glBegin(GL_QUADS)
@@ -217,8 +234,7 @@ def draw_rounded_box(x, y, width, height, radius=12, color=(0.1,0.1,0.1,0.7)):
     glDisable(GL_BLEND)
 
 def draw_icon(x, y, icon_type, size=18):
-    glEnable(GL_BLEND)
-    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    enable_blend()
     if icon_type == 'health':
         glColor3f(1,0,0)
         glBegin(GL_TRIANGLES)
@@ -241,4 +257,39 @@ def draw_icon(x, y, icon_type, size=18):
             angle = 2*math.pi*i/32
             glVertex2f(x+size/2+math.cos(angle)*size/2, y+size/2+math.sin(angle)*size/2)
         glEnd()
-    glDisable(GL_BLEND) 
\ No newline at end of file
+    glDisable(GL_BLEND) 
+
+def draw_tracers(pos, direction):
+    # One line per bullet, bright head fading into the tail, in a single draw call
+    n = len(pos)
+    if n == 0:
+        return
+    vertices = np.empty((n, 2, 3), dtype=np.float32)
+    vertices[:, 0] = pos
+    vertices[:, 1] = pos - direction * TRACER_LENGTH
+    colors = np.empty((n, 2, 3), dtype=np.float32)
+    colors[:, 0] = (1.0, 1.0, 0.2)
+    colors[:, 1] = (1.0, 0.8, 0.2)
+
+    glPushAttrib(GL_ENABLE_BIT | GL_LINE_BIT | GL_CURRENT_BIT)
+    glDisable(GL_LIGHTING)
+    glLineWidth(3.0)
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(vertices.ctypes.data))
+    glColorPointer(3, GL_FLOAT, 0, ctypes.c_void_p(colors.ctypes.data))
+    glDrawArrays(GL_LINES, 0, n * 2)
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    glPopAttrib()
+
+def draw_billboard(view, x, y, z, half_width, half_height):
+    # Camera-facing quad centred on (x, y, z) in the current colour; the cheapest LOD
+    center = np.array((x, y, z))
+    right = view.right * half_width
+    up = view.up * half_height
+    glBegin(GL_QUADS)
+    glNormal3f(*np.cross(view.right, view.up))
+    for corner in (center - right - up, center + right - up, center + right + up, center - right + up):
+        glVertex3f(*corner)
+    glEnd()
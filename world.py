@@ -0,0 +1,252 @@
+import hashlib
+import math
+import random
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from spatial import SpatialGrid
+
+DEFAULT_WORLD_SEED = 1337
+CHUNK_SIZE = 200.0  # Chunk (0, 0) is centred on the origin
+LOAD_RADIUS = 2  # Chunks kept active around the player in each direction (5x5)
+MAX_CHUNKS = 64  # Generated chunks kept in memory; least recently used are evicted first
+GENERATION_WORKERS = 2
+
+MOUNTAINS_PER_CHUNK = 3
+TREES_PER_CHUNK = 25
+CLOUDS_PER_CHUNK = 3
+RUNWAY_CHANCE = 0.1
+MOUNTAIN_SPACING = 30  # Minimum distance between mountains in a chunk
+MOUNTAIN_MAX_BASE = 20  # Half-width of the square footprint
+TREE_SPACING = 3
+TREE_HEIGHT = 4.5  # Top of the canopy
+TREE_HALF_WIDTH = 0.75
+RUNWAY_SIZE = [10, 200]  # width, length; fits inside one chunk at any of the four angles
+SPAWN_RUNWAY = ([0, 0.1, 0], RUNWAY_SIZE, 0)  # Always present in chunk (0, 0)
+CHUNK_HEIGHT = 70  # Above the highest cloud
+
+def chunk_seed(world_seed, cx, cz):
+    # Stable across processes and machines, unlike hash() which is salted per run
+    digest = hashlib.blake2b(struct.pack('<qqq', world_seed, cx, cz), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def chunk_coords(x, z):
+    return (math.floor(x / CHUNK_SIZE + 0.5), math.floor(z / CHUNK_SIZE + 0.5))
+
+def chunk_bounds(cx, cz):
+    # Box holding everything drawn for a chunk; mountains and clouds can hang over its edge
+    half = CHUNK_SIZE / 2 + MOUNTAIN_MAX_BASE
+    x, z = cx * CHUNK_SIZE, cz * CHUNK_SIZE
+    return (x - half, 0.0, z - half), (x + half, CHUNK_HEIGHT, z + half)
+
+def on_runway(x, z, runways, margin=0.0):
+    for r_pos, r_size, angle in runways:
+        half_x, half_z = r_size[0] / 2, r_size[1] / 2
+        if angle % 180 == 90:
+            half_x, half_z = half_z, half_x
+        if abs(x - r_pos[0]) < half_x + margin and abs(z - r_pos[2]) < half_z + margin:
+            return True
+    return False
+
+class Chunk:
+    def __init__(self, cx, cz):
+        self.cx, self.cz = cx, cz
+        self.mountains = []  # {'pos': [x, y, z], 'height': h, 'base': b}
+        self.trees = []  # [x, y, z]
+        self.runways = []  # ([x, y, z], [width, length], angle)
+        self.clouds = []  # {'pos': [x, y, z], 'size': s}
+        self.arrays = None  # Whatever World's prepare callback built (e.g. vertex arrays), off the main thread
+
+def generate_chunk(world_seed, cx, cz):
+    # Everything in a chunk comes from its own RNG, so any client regenerates the same chunk
+    rng = random.Random(chunk_seed(world_seed, cx, cz))
+    chunk = Chunk(cx, cz)
+    center_x, center_z = cx * CHUNK_SIZE, cz * CHUNK_SIZE
+    half = CHUNK_SIZE / 2
+
+    # Runways first, so nothing gets placed on them
+    if (cx, cz) == (0, 0):
+        chunk.runways.append(SPAWN_RUNWAY)
+    elif rng.random() < RUNWAY_CHANCE:
+        angle = rng.choice([0, 90, 180, 270])
+        chunk.runways.append(([center_x, 0.1, center_z], RUNWAY_SIZE, angle))
+
+    # Spacing checks go through grids, so each candidate only looks at its neighbours
+    placed = SpatialGrid(MOUNTAIN_SPACING)
+    for _ in range(MOUNTAINS_PER_CHUNK):
+        x = center_x + rng.uniform(-half, half)
+        z = center_z + rng.uniform(-half, half)
+        height = rng.uniform(5, 30)
+        base = rng.uniform(5, MOUNTAIN_MAX_BASE)
+        if on_runway(x, z, chunk.runways, margin=base):
+            continue
+        if placed.any_within(x, z, MOUNTAIN_SPACING):
+            continue  # Avoid clumping
+        placed.insert(len(chunk.mountains), x, z)
+        chunk.mountains.append({'pos': [x, 0, z], 'height': height, 'base': base})
+
+    placed = SpatialGrid(TREE_SPACING * 4)
+    for _ in range(TREES_PER_CHUNK):
+        x = center_x + rng.uniform(-half, half)
+        z = center_z + rng.uniform(-half, half)
+        if on_runway(x, z, chunk.runways):
+            continue
+        if placed.any_within(x, z, TREE_SPACING):
+            continue
+        placed.insert(len(chunk.trees), x, z)
+        chunk.trees.append([x, 0, z])
+
+    # Clouds are always generated so the RNG sequence doesn't depend on the weather
+    for _ in range(CLOUDS_PER_CHUNK):
+        x = center_x + rng.uniform(-half, half)
+        z = center_z + rng.uniform(-half, half)
+        y = rng.uniform(20, 50)  # High altitude
+        size = rng.uniform(5, 15)
+        chunk.clouds.append({'pos': [x, y, z], 'size': size})
+    return chunk
+
+def build_chunk(world_seed, cx, cz, prepare=None):
+    # Runs on a worker thread: must not touch GL
+    chunk = generate_chunk(world_seed, cx, cz)
+    if prepare is not None:
+        chunk.arrays = prepare(chunk)
+    return chunk
+
+class ObstacleIndex:
+    """Uniform grids over the scenery of a set of chunks, so placement, culling and
+    terrain-collision queries only look at nearby objects."""
+
+    def __init__(self):
+        self.mountains = []
+        self.trees = []
+        self.runways = []
+        self.mountain_grid = SpatialGrid(MOUNTAIN_MAX_BASE * 2)
+        self.tree_grid = SpatialGrid(TREE_SPACING * 4)
+        self.runway_grid = SpatialGrid(CHUNK_SIZE)
+        self.mountain_array = np.zeros((0, 4))
+        self.tree_array = np.zeros((0, 2))
+
+    def rebuild(self, chunks):
+        self.__init__()
+        for chunk in chunks:
+            for m in chunk.mountains:
+                self.mountain_grid.insert(len(self.mountains), m['pos'][0], m['pos'][2])
+                self.mountains.append(m)
+            for t in chunk.trees:
+                self.tree_grid.insert(len(self.trees), t[0], t[2])
+                self.trees.append(t)
+            for r in chunk.runways:
+                self.runway_grid.insert(len(self.runways), r[0][0], r[0][2])
+                self.runways.append(r)
+        # Columns for heights_at: x, z, base, height per mountain and x, z per tree
+        self.mountain_array = np.array([(m['pos'][0], m['pos'][2], m['base'], m['height'])
+                                        for m in self.mountains], dtype=float).reshape(-1, 4)
+        self.tree_array = np.array([(t[0], t[2]) for t in self.trees], dtype=float).reshape(-1, 2)
+
+    def near(self, x, z, radius):
+        # Mountains and trees whose centres are within radius of (x, z)
+        mountains = [self.mountains[i] for i in self.mountain_grid.query_radius(x, z, radius)]
+        trees = [self.trees[i] for i in self.tree_grid.query_radius(x, z, radius)]
+        return mountains, trees
+
+    def on_runway(self, x, z, margin=0.0):
+        reach = RUNWAY_SIZE[1] / 2 + margin
+        return on_runway(x, z, [self.runways[i] for i in self.runway_grid.candidates(x, z, reach)], margin)
+
+    def height_at(self, x, z):
+        # Height of the scenery standing at (x, z); 0 over open ground
+        height = 0.0
+        for i in self.mountain_grid.candidates(x, z, MOUNTAIN_MAX_BASE):
+            m = self.mountains[i]
+            dx, dz = abs(x - m['pos'][0]), abs(z - m['pos'][2])
+            if dx < m['base'] and dz < m['base']:
+                # Four-sided pyramid: height falls off linearly towards the square's edge
+                height = max(height, m['height'] * (1 - max(dx, dz) / m['base']))
+        for i in self.tree_grid.candidates(x, z, TREE_HALF_WIDTH):
+            tx, _, tz = self.trees[i]
+            if abs(x - tx) < TREE_HALF_WIDTH and abs(z - tz) < TREE_HALF_WIDTH:
+                height = max(height, TREE_HEIGHT)
+        return height
+
+    def heights_at(self, xs, zs):
+        # height_at for arrays of points: the grids pair each point with nearby obstacles,
+        # then every pair is evaluated as one array expression
+        heights = np.zeros(len(xs))
+        pairs = [(n, i) for n, (x, z) in enumerate(zip(xs, zs))
+                 for i in self.mountain_grid.candidates(x, z, MOUNTAIN_MAX_BASE)]
+        if pairs:
+            n, i = np.array(pairs).T
+            mx, mz, base, height = self.mountain_array[i].T
+            dx, dz = np.abs(xs[n] - mx), np.abs(zs[n] - mz)
+            inside = (dx < base) & (dz < base)
+            h = height * (1 - np.maximum(dx, dz) / base)
+            np.maximum.at(heights, n[inside], h[inside])
+        pairs = [(n, i) for n, (x, z) in enumerate(zip(xs, zs))
+                 for i in self.tree_grid.candidates(x, z, TREE_HALF_WIDTH)]
+        if pairs:
+            n, i = np.array(pairs).T
+            tx, tz = self.tree_array[i].T
+            inside = (np.abs(xs[n] - tx) < TREE_HALF_WIDTH) & (np.abs(zs[n] - tz) < TREE_HALF_WIDTH)
+            np.maximum.at(heights, n[inside], TREE_HEIGHT)
+        return heights
+
+class World:
+    """Deterministic chunked world: chunks are generated on demand from (seed, cx, cz)
+    on a worker pool and kept in an LRU cache."""
+
+    def __init__(self, seed=DEFAULT_WORLD_SEED, load_radius=LOAD_RADIUS, max_chunks=MAX_CHUNKS, prepare=None):
+        self.seed = seed
+        self.load_radius = load_radius
+        self.max_chunks = max(max_chunks, (2 * load_radius + 1) ** 2)
+        self.prepare = prepare  # Optional chunk -> arrays callback, run with the generation
+        self.chunks = OrderedDict()  # (cx, cz) -> Chunk, least recently used first
+        self.pending = {}  # (cx, cz) -> Future
+        self.executor = ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix='world')
+        self.center = None
+
+    def wanted_coords(self, pos):
+        # Chunks around pos, nearest first so they are generated first
+        ccx, ccz = chunk_coords(pos[0], pos[2])
+        r = self.load_radius
+        coords = [(ccx + dx, ccz + dz) for dx in range(-r, r + 1) for dz in range(-r, r + 1)]
+        coords.sort(key=lambda c: (c[0] - ccx) ** 2 + (c[1] - ccz) ** 2)
+        return coords
+
+    def update(self, pos, wait=False):
+        # Queue missing chunks and collect finished ones; wait=True generates them right here instead.
+        # Returns True if the active set changed.
+        changed = False
+        center = chunk_coords(pos[0], pos[2])
+        if center != self.center:
+            self.center = center
+            changed = True
+        wanted = self.wanted_coords(pos)
+        for coords in wanted:
+            if coords in self.chunks:
+                self.chunks.move_to_end(coords)
+            elif wait:
+                future = self.pending.pop(coords, None)
+                self.chunks[coords] = future.result() if future else build_chunk(self.seed, *coords, self.prepare)
+                changed = True
+            elif coords not in self.pending:
+                self.pending[coords] = self.executor.submit(build_chunk, self.seed, *coords, self.prepare)
+        for coords, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[coords]
+                self.chunks[coords] = future.result()
+                changed = True
+        # Drop queued work we no longer need (already running jobs just finish)
+        wanted = set(wanted)
+        for coords in [c for c in self.pending if c not in wanted]:
+            if self.pending[coords].cancel():
+                del self.pending[coords]
+        while len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return changed
+
+    def active_chunks(self, pos):
+        return [self.chunks[c] for c in self.wanted_coords(pos) if c in self.chunks]
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)